@@ -0,0 +1,167 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGES = 50
+
+# Requests the lean profile never lets the browser make: media, fonts, styles,
+# and analytics/ads hosts. Only the HTML and the scripts that build the floor
+# plan and amenity DOM are needed.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.css",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*",
+    "*optimizely.com*", "*branch.io*", "*bing.com*", "*cookielaw.org*",
+]
+
+
+def default_chrome_options() -> Options:
+    """Headless Chrome options that render the full page."""
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    return options
+
+
+def lean_chrome_options() -> Options:
+    """
+    Headless Chrome options for data extraction: images and notifications are
+    disabled and get() returns at DOMContentLoaded instead of the full load event.
+    """
+    options = default_chrome_options()
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-extensions")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    options.page_load_strategy = "eager"
+    return options
+
+
+def block_heavy_resources(driver) -> None:
+    """Blocks LEAN_BLOCKED_URLS for the driver through the DevTools protocol."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of long-lived headless Chrome drivers.
+
+    At most `size` drivers exist at once; callers check one out per page with
+    `with pool.driver() as driver:`. Idle drivers are health-checked before reuse,
+    and a driver is quit and replaced after `max_pages` pages or when an error
+    escapes the `with` block.
+
+    Drivers use the lean rendering profile by default; pass
+    options_factory=default_chrome_options and on_create=None for full pages.
+
+    Attributes:
+        size (int): Maximum number of drivers (pages rendered in parallel).
+        max_pages (int): Pages a driver renders before it is recycled.
+        options_factory (callable): Returns the Options for a new driver.
+        on_create (callable): Called with every new driver, e.g. to block resources.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_pages: int = DEFAULT_MAX_PAGES,
+                 options_factory=lean_chrome_options, on_create=block_heavy_resources):
+        self.size = size
+        self.max_pages = max_pages
+        self.options_factory = options_factory
+        self.on_create = on_create
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _new_driver(self) -> _PooledDriver:
+        driver = webdriver.Chrome(options=self.options_factory())
+        if self.on_create:
+            try:
+                self.on_create(driver)
+            except Exception:
+                driver.quit()
+                raise
+        return _PooledDriver(driver)
+
+    @staticmethod
+    def _healthy(entry: _PooledDriver) -> bool:
+        try:
+            entry.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _discard(entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            print("Error quitting Chrome driver:", e)
+
+    def _take(self) -> _PooledDriver:
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_driver()
+            if self._healthy(entry):
+                return entry
+            print("Discarding unresponsive Chrome driver.")
+            self._discard(entry)
+
+    @contextmanager
+    def driver(self):
+        """Checks out a driver for one page, blocking while all drivers are busy."""
+        self._slots.acquire()
+        entry = None
+        try:
+            entry = self._take()
+            yield entry.driver
+            entry.pages += 1
+            if entry.pages >= self.max_pages:
+                self._discard(entry)
+            else:
+                self._idle.put(entry)
+            entry = None
+        finally:
+            if entry is not None:
+                self._discard(entry)
+            self._slots.release()
+
+    def close(self) -> None:
+        """Quits every idle driver."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size: int = DEFAULT_POOL_SIZE) -> BrowserPool:
+    """Returns the process-wide pool, creating it with `size` drivers on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool(size)
+            atexit.register(_default_pool.close)
+        return _default_pool
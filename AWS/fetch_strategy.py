@@ -0,0 +1,75 @@
+import os
+import threading
+
+from caching import DEFAULT_CACHE_DIR, SqliteCache
+
+DEFAULT_RENDER_STATS_PATH = os.path.join(DEFAULT_CACHE_DIR, "render_stats.sqlite3")
+
+FETCH_MODES = ("requests", "selenium", "auto")
+AMENITY_BLOCKS = ("PetsBlock", "ParkingTypeBlock", "LeaseTermBlock")
+
+
+def has_required_fields(doc) -> bool:
+    """True when the parsed page already holds floor plans and at least one amenities block."""
+    if not doc.find("div", class_="floorPlanInfo"):
+        return False
+    return any(doc.find("div", class_=block) for block in AMENITY_BLOCKS)
+
+
+class RenderStats:
+    """
+    Per-domain record of whether static pages carried the required fields.
+
+    In "auto" mode a domain whose static pages needed the browser at least
+    `threshold` of the time (over `min_samples` pages) goes straight to the
+    browser. Every `probe_every`-th page of such a domain is still tried
+    statically so the decision follows changes on the site.
+
+    Attributes:
+        stats (dict): domain -> {"static": pages served statically, "rendered": pages that needed the browser}.
+    """
+
+    def __init__(self, path: str = DEFAULT_RENDER_STATS_PATH, min_samples: int = 5,
+                 threshold: float = 0.9, probe_every: int = 20):
+        self.store = SqliteCache(path, table="render_stats")
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.probe_every = probe_every
+        self.stats = {}
+        self._skipped = {}
+        self._lock = threading.Lock()
+
+    def _domain_stats(self, domain: str) -> dict:
+        if domain not in self.stats:
+            entry = self.store.get(domain)
+            self.stats[domain] = entry[0] if entry else {"static": 0, "rendered": 0}
+        return self.stats[domain]
+
+    def should_render(self, domain: str) -> bool:
+        """True if the page should skip the static fetch and go straight to the browser."""
+        with self._lock:
+            counts = self._domain_stats(domain)
+            total = counts["static"] + counts["rendered"]
+            if total < self.min_samples or counts["rendered"] / total < self.threshold:
+                return False
+            self._skipped[domain] = self._skipped.get(domain, 0) + 1
+            return self._skipped[domain] % self.probe_every != 0
+
+    def record(self, domain: str, rendered: bool) -> None:
+        with self._lock:
+            counts = self._domain_stats(domain)
+            counts["rendered" if rendered else "static"] += 1
+            self.store.set(domain, counts)
+
+
+_default_render_stats = None
+_default_render_stats_lock = threading.Lock()
+
+
+def get_render_stats() -> RenderStats:
+    """Returns the process-wide RenderStats."""
+    global _default_render_stats
+    with _default_render_stats_lock:
+        if _default_render_stats is None:
+            _default_render_stats = RenderStats()
+        return _default_render_stats
@@ -0,0 +1,105 @@
+import threading
+
+import requests
+
+from geocode_cache import GeocodeCache
+from page_store import PageStore, StoringAdapter
+from rate_limiter import PacedAdapter
+
+
+def _accept_encoding() -> str:
+    """Advertises brotli only when urllib3 can decode it."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/85.0.4183.121 Safari/537.36"
+    ),
+    "Accept-Encoding": _accept_encoding(),
+}
+
+# (connect, read) timeout in seconds applied to every request that does not pass its own.
+DEFAULT_TIMEOUT = (5, 30)
+
+# Keep-alive connections kept open per host. They should be at least as large as the
+# number of threads that hit the host at the same time, otherwise connections are
+# discarded after use and the TLS handshake is paid again.
+POOL_SIZES = {
+    "www.redfin.com": 16,
+    "www.areavibes.com": 8,
+}
+DEFAULT_POOL_SIZE = 4
+
+# Hosts whose pages are recorded in the page store (see page_store.py).
+STORED_HOSTS = ("www.redfin.com", "www.areavibes.com")
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with keep-alive pools sized per host, compression negotiation,
+    shared default headers and a default timeout. Every request is paced by its
+    host's adaptive rate limiter, and pages of STORED_HOSTS go through the page
+    store, which revalidates them with conditional GETs.
+
+    Attributes:
+        timeout (tuple): Default (connect, read) timeout in seconds.
+        page_store (PageStore): Raw page store, or None to disable it.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_sizes: dict = None, page_store: PageStore = None):
+        super().__init__()
+        self.timeout = timeout
+        self.page_store = page_store
+        self.headers.update(DEFAULT_HEADERS)
+
+        pool_sizes = dict(POOL_SIZES if pool_sizes is None else pool_sizes)
+        default_adapter = PacedAdapter(pool_connections=16, pool_maxsize=DEFAULT_POOL_SIZE)
+        self.mount("https://", default_adapter)
+        self.mount("http://", default_adapter)
+        for host in STORED_HOSTS:
+            pool_sizes.setdefault(host, DEFAULT_POOL_SIZE)
+        for host, size in pool_sizes.items():
+            if page_store is not None and host in STORED_HOSTS:
+                adapter = StoringAdapter(page_store, pool_connections=1, pool_maxsize=size)
+            else:
+                adapter = PacedAdapter(pool_connections=1, pool_maxsize=size)
+            self.mount(f"https://{host}/", adapter)
+            self.mount(f"http://{host}/", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PooledSession:
+    """Returns the process-wide session shared by every scraper."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = PooledSession(page_store=PageStore())
+    return _session
+
+
+def set_replay_mode(enabled: bool = True) -> None:
+    """
+    Serves every stored-host request from the page store and every geocoding
+    lookup from the geocode cache without touching the network, so the
+    extractors can be re-run offline.
+    """
+    get_session().page_store.replay = enabled
+    GeocodeCache.replay = enabled
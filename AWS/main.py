@@ -1,34 +1,135 @@
 # main.py
 
+import argparse
+import json
+import os
+import socket
+import threading
+from urllib.parse import urlparse
+
 from property_scraper import PropertyScraper
 from neighborhood_scraper import NeighborhoodScraper
+from rate_limiter import CircuitOpenError, get_breaker
+from work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE_PATH, SqliteWorkQueue, Worker
 
 
-def main():
-    # Example URL string: the first token is the property URL,
-    # and any tokens after (separated by spaces) indicate a room choice.
-    url_full = "https://www.redfin.com/WA/Seattle/2nd-and-John/apartment/145726232 1x1+D"
+AREAVIBES_HOST = "www.areavibes.com"
 
-    # Initialize the property scraper.
-    # Set use_selenium=True if you expect dynamic content that requests cannot fetch.
-    property_scraper = PropertyScraper(url_full, use_selenium=False)
-    property_info = property_scraper.get_property_info()
 
-    print("----- PROPERTY INFO -----")
-    for key, value in property_info.items():
-        print(f"{key}: {value}")
+def check_circuit(host: str) -> None:
+    """Raises CircuitOpenError while the host's circuit breaker is open."""
+    delay = get_breaker(host).retry_after()
+    if delay > 0:
+        raise CircuitOpenError(host, delay)
+
+
+def scrape_listing(url_full: str, fetch_mode: str = "auto") -> dict:
+    """
+    Scrapes one url.txt entry: property details, every floor plan (under
+    "Floor Plans") and the neighborhood information of its address.
+    Raises an exception if the property page could not be scraped, and
+    CircuitOpenError if Redfin or Areavibes is failing, so a queue worker
+    can defer the entry until the host recovers.
+    """
+    property_host = urlparse(url_full.split()[0]).hostname
+    check_circuit(property_host)
+    # fetch_mode="auto" fetches with requests and only renders the page in the browser
+    # when floor plans or amenities are missing ("requests"/"selenium" force one path).
+    # all_floor_plans=True also lists every unit on the page under "Floor Plans".
+    property_scraper = PropertyScraper(url_full, fetch_mode=fetch_mode, all_floor_plans=True)
+    property_info = property_scraper.get_property_info()
+    if not property_info:
+        check_circuit(property_host)
+        raise Exception(f"Could not scrape {url_full}")
 
     # If a valid address was found, fetch neighborhood information.
     address = property_info.get("Address")
     if address and "Address not found" not in address:
+        check_circuit(AREAVIBES_HOST)
         neighborhood_scraper = NeighborhoodScraper(address)
-        neighborhood_info = neighborhood_scraper.get_neighborhood_info()
-
-        print("\n----- NEIGHBORHOOD INFO -----")
-        for key, value in neighborhood_info.items():
-            print(f"{key}: {value}")
+        property_info.update(neighborhood_scraper.get_neighborhood_info())
+        # Default "N/A" metrics because Areavibes went down mid-listing are not kept.
+        check_circuit(AREAVIBES_HOST)
     else:
         print("No valid address found; skipping neighborhood lookup.")
+    return property_info
+
+
+def print_listing(property_info: dict) -> None:
+    floor_plans = property_info.pop("Floor Plans", [])
+
+    print("----- LISTING INFO -----")
+    for key, value in property_info.items():
+        print(f"{key}: {value}")
+
+    print(f"\n----- FLOOR PLANS ({len(floor_plans)}) -----")
+    for unit in floor_plans:
+        print(", ".join(f"{key}: {value}" for key, value in unit.items()))
+
+
+def run_workers(args) -> None:
+    """
+    Queues the entries of the URL file and processes the queue with args.workers
+    worker threads. Any number of these processes, on this or other hosts sharing
+    the queue, can run at once; each task is leased to a single worker.
+    """
+    queue = SqliteWorkQueue(args.queue, max_attempts=args.max_attempts)
+    if args.url_file:
+        with open(args.url_file, "r", encoding="utf-8") as f:
+            added = queue.put(line.strip() for line in f if line.strip())
+        print(f"Queued {added} new entries from {args.url_file}.")
+    if args.enqueue_only:
+        print(f"Queue: {queue.counts()}")
+        return
+
+    # One results file per process, so workers never contend for an output file.
+    os.makedirs(args.output_dir, exist_ok=True)
+    output_path = os.path.join(args.output_dir, f"{socket.gethostname()}-{os.getpid()}.ndjson")
+    output_lock = threading.Lock()
+
+    def handle(url_full: str) -> None:
+        record = {"URL": url_full, **scrape_listing(url_full)}
+        with output_lock, open(output_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    workers = [
+        Worker(queue, handle, f"{socket.gethostname()}-{os.getpid()}-{i}", args.lease_seconds)
+        for i in range(args.workers)
+    ]
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"Processed {sum(worker.processed for worker in workers)} entries into {output_path}.")
+    print(f"Queue: {queue.counts()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Redfin listings, alone or as part of a worker fleet.")
+    parser.add_argument("--url-file", help="Queue the entries of this url.txt file and process the queue.")
+    parser.add_argument("--worker", action="store_true",
+                        help="Process the queue without adding entries (other hosts queue them).")
+    parser.add_argument("--enqueue-only", action="store_true", help="Queue the URL file and exit.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="SQLite work queue shared by the workers.")
+    parser.add_argument("--workers", type=int, default=2, help="Worker threads in this process.")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Lease length; a worker that stops heartbeating loses its task after this.")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Attempts per entry before it is marked failed.")
+    parser.add_argument("--output-dir", default="results", help="Directory for the per-process NDJSON results.")
+    args = parser.parse_args()
+
+    if args.url_file or args.worker:
+        run_workers(args)
+        return
+
+    # Example URL string: the first token is the property URL,
+    # and any tokens after (separated by spaces) indicate a room choice.
+    url_full = "https://www.redfin.com/WA/Seattle/2nd-and-John/apartment/145726232 1x1+D"
+    try:
+        print_listing(scrape_listing(url_full))
+    except Exception as e:
+        print(f"Error: {e}")
 
 
 if __name__ == "__main__":
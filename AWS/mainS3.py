@@ -17,6 +17,13 @@ def main():
             "Sqft": "750",
             "Availability": "Now"
         },
+        # Every unit on the page, from PropertyScraper(..., all_floor_plans=True).
+        "Floor Plans": [
+            {"Room Title": "1x1 Deluxe", "Bed/Baths": "1 Bed / 1 Bath", "Price": "$1200",
+             "Sqft": "750", "Availability": "Now"},
+            {"Room Title": "2x2 Corner", "Bed/Baths": "2 Beds / 2 Baths", "Price": "$1900",
+             "Sqft": "1,050", "Availability": "2 available"},
+        ],
         "Amenities": {
             "Cats Allowed": True,
             "Dogs Allowed": False,
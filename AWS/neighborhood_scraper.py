@@ -1,35 +1,56 @@
-import time
 import requests
 import re
 from bs4 import BeautifulSoup
 from geopy.geocoders import Nominatim
 
+from geocode_cache import GeocodeCache
+from http_session import get_session
+from neighborhood_cache import NeighborhoodCache
+from neighborhood_index import NeighborhoodIndex
+
+# Shared by every NeighborhoodScraper so an address is geocoded at most once,
+# nearby addresses reuse a resolved neighborhood URL, and a neighborhood page is
+# downloaded at most once per freshness window.
+default_geocode_cache = GeocodeCache(Nominatim(user_agent="geoapi"))
+default_neighborhood_index = NeighborhoodIndex()
+default_neighborhood_cache = NeighborhoodCache()
+
 
 class NeighborhoodScraper:
     """
     Scrapes neighborhood statistics based on a provided address.
     (This example uses Areavibes to retrieve data such as livability, amenities, and more.)
+
+    Attributes:
+        address (str): Street address of the property.
+        geocode_cache (GeocodeCache): Persistent geocoding cache in front of Nominatim.
+        neighborhood_index (NeighborhoodIndex): Known (lat, lon) -> neighborhood URL mappings.
+        neighborhood_cache (NeighborhoodCache): Parsed neighborhood info keyed by Areavibes URL.
     """
 
-    def __init__(self, address: str):
+    def __init__(self, address: str, geocode_cache: GeocodeCache = None,
+                 neighborhood_index: NeighborhoodIndex = None,
+                 neighborhood_cache: NeighborhoodCache = None):
         self.address = address
-        self.geolocator = Nominatim(user_agent="geoapi")
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/85.0.4183.121 Safari/537.36"
-            )
-        }
+        self.geocode_cache = geocode_cache or default_geocode_cache
+        self.neighborhood_index = neighborhood_index or default_neighborhood_index
+        self.neighborhood_cache = neighborhood_cache or default_neighborhood_cache
+        self.geolocator = self.geocode_cache.geolocator
 
     def generate_link(self) -> str:
         """
         Generates a URL to fetch neighborhood details based on the address.
+        Addresses near an already resolved point skip the Areavibes search request.
         """
-        location = self.geolocator.geocode(self.address)
+        location = self.geocode_cache.geocode(self.address)
         if not location:
             raise Exception("Could not geocode the address.")
 
+        known_url = self.neighborhood_index.lookup(location.latitude, location.longitude)
+        if known_url:
+            print(f"Neighborhood URL from spatial index: {known_url}")
+            return known_url
+
         split_address = self.address.split(",")
         if len(split_address) < 3:
             raise Exception("Address format is incorrect. Expected at least 'Street, City, State,...'")
@@ -41,18 +62,13 @@ class NeighborhoodScraper:
             f"https://www.areavibes.com/search-results/?st={state}&ct={city}"
             f"zip=&addr={addr_url}&ll={location.latitude}+{location.longitude}"
         )
-        time.sleep(3)  
-
-        response = None
-        for attempt in range(3):
-            try:
-                response = requests.get(pre_url, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    break
-            except requests.RequestException as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                time.sleep(2)
-        if not response or response.status_code != 200:
+
+        # Pacing and retries are handled by the session's adaptive rate limiter.
+        try:
+            response = get_session().get(pre_url, timeout=10)
+        except requests.RequestException as e:
+            raise Exception(f"Failed to retrieve the neighborhood search page: {e}")
+        if response.status_code != 200:
             raise Exception("Failed to retrieve the neighborhood search page after multiple attempts.")
 
         soup = BeautifulSoup(response.text, "html.parser")
@@ -61,6 +77,7 @@ class NeighborhoodScraper:
             href = element.get("href")
             url = f"https://www.areavibes.com{href}"
             print(f"Generated neighborhood URL: {url}")
+            self.neighborhood_index.add(location.latitude, location.longitude, url)
             return url
         else:
             print("No neighborhood URL found.")
@@ -69,9 +86,27 @@ class NeighborhoodScraper:
     def get_neighborhood_info(self) -> dict:
         """
         Fetches and parses neighborhood information from the generated URL.
+        Pages already parsed within the cache's freshness window are not downloaded again.
         """
         url = self.generate_link()
-        info = {
+        if not url:
+            return self._default_info()
+
+        try:
+            return self.neighborhood_cache.get_info(url, self._download_info)
+        except Exception as e:
+            print(f"Error fetching neighborhood info: {e}")
+            return self._default_info()
+
+    def _download_info(self, url: str) -> dict:
+        """Downloads the neighborhood page and parses it."""
+        response = get_session().get(url)
+        response.raise_for_status()
+        return self._parse_info(response.text)
+
+    @staticmethod
+    def _default_info() -> dict:
+        return {
             "Livability": "N/A",
             "Amenities": "N/A",
             "Commute": "N/A",
@@ -83,42 +118,37 @@ class NeighborhoodScraper:
             "Schools": "N/A",
             "Ratings": "N/A"
         }
-        if not url:
-            return info
 
-        try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            livability_score = soup.find("span", class_="cw-score-numerator")
-            if livability_score:
-                info["Livability"] = f"{livability_score.text.strip()}/100"
-
-            categories = soup.find_all("div", class_="widget-entry ac")
-            for category in categories:
-                category_name = category.find("span")
-                grade_element = category.find("i")
-                if category_name:
-                    cat_text = category_name.text.strip()
-                    grade_text = grade_element.text.strip() if grade_element else "N/A"
-                    info[cat_text] = grade_text
-
-            subcategories = soup.find_all("div", class_="widget-indiv-entry")
-            for subcategory in subcategories:
-                subcat_name = subcategory.find("b")
-                if subcat_name:
-                    subcat_text = subcat_name.text.strip()
-                    subcat_number = subcat_name.next_sibling
-                    if subcat_number and isinstance(subcat_number, str):
-                        subcat_number = re.sub(r"\s+", " ", subcat_number).strip(" ()")
-                    else:
-                        subcat_number = "N/A"
-                    grade_element = subcategory.find("i")
-                    grade_text = grade_element.text.strip() if grade_element else "N/A"
-                    info[subcat_text] = f"({subcat_number}) {grade_text}".replace("\n", "").strip()
+    def _parse_info(self, html: str) -> dict:
+        """Parses the livability score, category grades and sub-category grades."""
+        info = self._default_info()
+        soup = BeautifulSoup(html, "html.parser")
 
-        except Exception as e:
-            print(f"Error fetching neighborhood info: {e}")
+        livability_score = soup.find("span", class_="cw-score-numerator")
+        if livability_score:
+            info["Livability"] = f"{livability_score.text.strip()}/100"
+
+        categories = soup.find_all("div", class_="widget-entry ac")
+        for category in categories:
+            category_name = category.find("span")
+            grade_element = category.find("i")
+            if category_name:
+                cat_text = category_name.text.strip()
+                grade_text = grade_element.text.strip() if grade_element else "N/A"
+                info[cat_text] = grade_text
+
+        subcategories = soup.find_all("div", class_="widget-indiv-entry")
+        for subcategory in subcategories:
+            subcat_name = subcategory.find("b")
+            if subcat_name:
+                subcat_text = subcat_name.text.strip()
+                subcat_number = subcat_name.next_sibling
+                if subcat_number and isinstance(subcat_number, str):
+                    subcat_number = re.sub(r"\s+", " ", subcat_number).strip(" ()")
+                else:
+                    subcat_number = "N/A"
+                grade_element = subcategory.find("i")
+                grade_text = grade_element.text.strip() if grade_element else "N/A"
+                info[subcat_text] = f"({subcat_number}) {grade_text}".replace("\n", "").strip()
 
         return info
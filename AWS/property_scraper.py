@@ -1,12 +1,17 @@
 import time
+from urllib.parse import urlparse
+
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from browser_pool import BrowserPool, get_browser_pool
+from extraction import DEFAULT_EXTRACTORS, FLOOR_PLAN_EXTRACTORS, ExtractionEngine, unit_rows
+from fetch_strategy import FETCH_MODES, get_render_stats, has_required_fields
+from http_session import get_session
+
 
 class PropertyScraper:
     """
@@ -16,206 +21,148 @@ class PropertyScraper:
         url_full (str): The URL (with optional room choice appended after a space).
         room_choice (str): Specific room details to filter for.
         use_selenium (bool): Whether to load the page with Selenium (e.g., to click on expandable elements).
+        fetch_mode (str): "requests", "selenium" or "auto". "auto" fetches statically and
+            renders with the browser only when floor plans or amenities are missing.
+            Defaults to "selenium" if use_selenium is set, otherwise "requests".
+        parser_backend (str): HTML parser used by the extraction engine ("html.parser", "lxml" or "selectolax").
+        all_floor_plans (bool): Also extract every floor plan on the page into a "Floor Plans"
+            list of unit records, in the same pass.
+        last_timings (dict): Per-extractor timing breakdown (seconds) of the last get_property_info call.
+        browser_pool (BrowserPool): Pool of headless Chrome drivers used in selenium mode
+            (the shared process-wide pool by default).
     """
 
-    def __init__(self, url_full: str, use_selenium: bool = False):
+    def __init__(self, url_full: str, use_selenium: bool = False, parser_backend: str = "html.parser",
+                 browser_pool: BrowserPool = None, fetch_mode: str = None, all_floor_plans: bool = False):
         # The URL may include extra info (e.g., room choice) after a space.
         parts = url_full.split()
         self.url = parts[0]
         self.room_choice = " ".join(parts[1:]) if len(parts) > 1 else None
         self.use_selenium = use_selenium
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/85.0.4183.121 Safari/537.36"
-            )
-        }
+        self.fetch_mode = fetch_mode or ("selenium" if use_selenium else "requests")
+        if self.fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode '{self.fetch_mode}'. Expected one of {FETCH_MODES}.")
+        self.all_floor_plans = all_floor_plans
+        self.engine = ExtractionEngine(parser_backend,
+                                       FLOOR_PLAN_EXTRACTORS if all_floor_plans else DEFAULT_EXTRACTORS)
+        self.last_timings = {}
+        self.browser_pool = browser_pool
 
     def get_property_info(self) -> dict:
         """
         Retrieves property information including name, address, room details, and amenities.
+        The page is parsed once and every field is extracted from that single tree.
         """
-        info = {}
-        html_content = self._fetch_html()
-        if not html_content:
+        document = self._fetch_document()
+        if document is None:
             return {}
 
-        info["Building Name"] = self._get_name(html_content)
-        info["Address"] = self._get_address(html_content)
-        room_info = self._get_room_info(html_content)
-        info.update(room_info)
-        amenities = self._get_amenities(html_content)
-        info.update(amenities)
-        return info
+        result = self.engine.extract_parsed(document[0], self.room_choice, document[1])
+        self.last_timings = result.timings
+        return result.fields
+
+    def get_unit_rows(self) -> list:
+        """
+        Retrieves the property once and returns one flat row per floor plan
+        (building fields plus that unit's room fields), ready for CSV output.
+        Requires all_floor_plans=True.
+        """
+        if not self.all_floor_plans:
+            raise ValueError("get_unit_rows requires all_floor_plans=True.")
+        property_info = self.get_property_info()
+        return unit_rows(property_info) if property_info else []
 
     def _fetch_html(self) -> str:
         """Fetches HTML content using either Requests or Selenium."""
-        if self.use_selenium:
+        if self.fetch_mode == "selenium":
             return self._fetch_html_selenium()
         else:
             return self._fetch_html_requests()
 
+    def _parse(self, html: str) -> tuple:
+        """Parses the page, returning the document and the seconds it took."""
+        started = time.perf_counter()
+        doc = self.engine.parse(html)
+        return doc, time.perf_counter() - started
+
+    def _fetch_document(self):
+        """Fetches and parses the page; returns (doc, parse_seconds) or None."""
+        if self.fetch_mode == "auto":
+            return self._fetch_document_auto()
+        html_content = self._fetch_html()
+        return self._parse(html_content) if html_content else None
+
+    def _fetch_document_auto(self):
+        """
+        Tries the static fetch first and escalates to the browser only when the
+        required fields are missing. Domains that (almost) always need the browser,
+        according to the recorded per-domain stats, skip the static attempt.
+        A static fetch that fails (network error, 4xx/5xx, open circuit) is not
+        retried in the browser and does not count towards the domain's stats.
+        """
+        domain = urlparse(self.url).hostname
+        render_stats = get_render_stats()
+        if not render_stats.should_render(domain):
+            html_content = self._fetch_html_requests()
+            if not html_content:
+                return None
+            doc, parse_seconds = self._parse(html_content)
+            if has_required_fields(doc):
+                render_stats.record(domain, rendered=False)
+                return doc, parse_seconds
+            print("Floor plans or amenities missing from the static page. Rendering with the browser...")
+            render_stats.record(domain, rendered=True)
+
+        html_content = self._fetch_html_selenium()
+        return self._parse(html_content) if html_content else None
+
     def _fetch_html_requests(self) -> str:
-        """Fetches HTML using the requests library (with retry logic)."""
-        for attempt in range(3):
-            try:
-                response = requests.get(self.url, headers=self.headers)
-                if response.status_code == 429:
-                    print(f"Rate limit hit. Retrying in {2**attempt} seconds...")
-                    time.sleep(2**attempt)
-                else:
-                    response.raise_for_status()
-                    return response.text
-            except requests.RequestException as e:
-                print(f"Attempt {attempt + 1} failed: {e}")
-                time.sleep(2**attempt)
-        print("Max retries reached for requests.")
-        return ""
+        """
+        Fetches HTML over the shared keep-alive session. Pacing and retries on
+        429/5xx are handled by the session's adaptive per-host rate limiter.
+        """
+        try:
+            response = get_session().get(self.url)
+            response.raise_for_status()
+            return response.text
+        except requests.RequestException as e:
+            print(f"Request for {self.url} failed: {e}")
+            return ""
 
     def _fetch_html_selenium(self) -> str:
-        """Fetches HTML using Selenium (e.g., to handle dynamically loaded content)."""
-        options = Options()
-        options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        driver = webdriver.Chrome(options=options)
-
+        """
+        Fetches HTML using Selenium (e.g., to handle dynamically loaded content).
+        The page is rendered by a driver checked out from the browser pool.
+        """
+        pool = self.browser_pool or get_browser_pool()
         try:
-            driver.get(self.url)
-            wait = WebDriverWait(driver, 10)
-            try:
-                expandable_button = wait.until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "ExpandableLink--expanded"))
-                )
-                if expandable_button:
-                    print("Found expandable button. Clicking it...")
-                    driver.execute_script("arguments[0].click();", expandable_button)
-                    time.sleep(2) 
-            except Exception as e:
-                print("Expandable button not found or not clickable:", e)
-            return driver.page_source
+            with pool.driver() as driver:
+                driver.get(self.url)
+                wait = WebDriverWait(driver, 10)
+                try:
+                    # Stop as soon as the floor plans are in the DOM instead of a fixed sleep.
+                    wait.until(EC.presence_of_element_located((By.CLASS_NAME, "floorPlanInfo")))
+                    expandable_button = self._find_expand_button(driver)
+                    if expandable_button is not None:
+                        print("Found expandable button. Clicking it...")
+                        floor_plans = len(driver.find_elements(By.CLASS_NAME, "floorPlanInfo"))
+                        driver.execute_script("arguments[0].click();", expandable_button)
+                        # The click re-renders the list: wait for the button to be replaced
+                        # or for the extra floor plans to appear.
+                        wait.until(lambda d: EC.staleness_of(expandable_button)(d)
+                                   or len(d.find_elements(By.CLASS_NAME, "floorPlanInfo")) > floor_plans)
+                except Exception as e:
+                    print("Floor plans not rendered or expanded floor plans did not load:", e)
+                return driver.page_source
         except Exception as e:
             print("Error fetching page with Selenium:", e)
             return ""
-        finally:
-            driver.quit()
-
-    def _get_name(self, html: str) -> str:
-        """Parses the property name."""
-        soup = BeautifulSoup(html, "html.parser")
-        element = soup.find("h1", class_="property-header")
-        return element.text.strip() if element else "Name not found"
-
-    def _get_address(self, html: str) -> str:
-        """Parses the property address."""
-        soup = BeautifulSoup(html, "html.parser")
-        element = soup.find("h2", class_="full-address")
-        return element.text.strip() if element else "Address not found"
-
-    def _get_room_info(self, html: str) -> dict:
-        """
-        Parses the room (floor plan) details if a room choice was provided.
-        """
-        info = {
-            "Room Title": "None",
-            "Bed/Baths": "None",
-            "Price": "None",
-            "Sqft": "None",
-            "Availability": "None"
-        }
-        if not self.room_choice:
-            return info
-
-        soup = BeautifulSoup(html, "html.parser")
-        elements = soup.find_all("div", class_="floorPlanInfo")
-        if not elements:
-            print("No floorPlanInfo elements found.")
-            return info
-
-        for element in elements:
-            name_div = element.find("div", class_="name")
-            if name_div:
-                room_name = name_div.text.strip()
-                print(f"Found Room Title: {room_name}")
-                if room_name != self.room_choice:
-                    continue
-            else:
-                continue
-
-            details = element.find("div", class_="details")
-            price = element.find("div", class_="price")
-            available_count = element.find("div", class_="availableCount")
-
-            info["Room Title"] = room_name
-            if details and "·" in details.text:
-                parts = details.text.split("·")
-                if len(parts) >= 3:
-                    info["Bed/Baths"] = parts[0].strip()
-                    info["Sqft"] = parts[2].strip().replace("Sqft.", "").strip()
-            info["Price"] = price.text.strip() if price else "None"
-            info["Availability"] = available_count.text.strip() if available_count else "None"
-            break  
-
-        return info
-
-    def _get_amenities(self, html: str) -> dict:
-        """Parses the amenities data from the page."""
-        soup = BeautifulSoup(html, "html.parser")
-        amenities = {
-            "Cats Allowed": False,
-            "Dogs Allowed": False,
-            "Cat Rent": None,
-            "Dog Rent": None,
-            "Parking Type": None,
-            "Parking Fee": None,
-            "Assigned Parking": None,
-            "EV Parking Fee": None,
-            "Lease Term": None,
-            "Application fee": None
-        }
-
-        pets_blocks = soup.find_all("div", class_="PetsBlock")
-        for pet_block in pets_blocks:
-            pet_type = pet_block.find("h3")
-            pet_rent = pet_block.find("div", class_="table-value")
-            if pet_type and "Cats welcome" in pet_type.text:
-                amenities["Cats Allowed"] = True
-                amenities["Cat Rent"] = pet_rent.text.strip() if pet_rent else None
-            if pet_type and "Dogs welcome" in pet_type.text:
-                amenities["Dogs Allowed"] = True
-                amenities["Dog Rent"] = pet_rent.text.strip() if pet_rent else None
-
-        parking_block = soup.find("div", class_="ParkingTypeBlock")
-        if parking_block:
-            parking_rows = parking_block.find_all("div", class_="table-row")
-            for row in parking_rows:
-                label = row.find("span", class_="table-label")
-                value = row.find("div", class_="table-value")
-                if label and value:
-                    if "Type" in label.text:
-                        amenities["Parking Type"] = value.text.strip()
-                    elif "Parking fee" in label.text:
-                        amenities["Parking Fee"] = value.text.strip()
-                    elif "Assigned" in label.text:
-                        amenities["Assigned Parking"] = value.text.strip()
-
-            ev_parking_fee = parking_block.find("p", class_="comment")
-            if ev_parking_fee and "EV Spots Available" in ev_parking_fee.text:
-                amenities["EV Parking Fee"] = ev_parking_fee.text.split("for ")[-1].strip()
-
-        lease_term = soup.find("div", class_="LeaseTermBlock")
-        if lease_term:
-            lease_rows = lease_term.find_all("div", class_="table-row")
-            for row in lease_rows:
-                label = row.find("span", class_="table-label")
-                value = row.find("div", class_="table-value")
-                if label and value:
-                    key = label.text.strip()
-                    val = value.text.strip()
-                    if key == "Term type":
-                        amenities["Lease Term"] = val
-                    elif key == "Application fee":
-                        amenities["Application fee"] = val
-
-        return amenities
+
+    @staticmethod
+    def _find_expand_button(driver, timeout: float = 3):
+        """Waits briefly for the "show more" floor plan button; returns it, or None if the page has none."""
+        try:
+            return WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "ExpandableLink--expanded")))
+        except TimeoutException:
+            return None
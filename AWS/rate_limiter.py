@@ -0,0 +1,277 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Starting and maximum request rates (requests per second) per host. The limiter
+# climbs towards max_rate while responses are healthy and halves on 429/5xx.
+HOST_RATES = {
+    "www.redfin.com": {"rate": 2.0, "max_rate": 8.0},
+    "www.areavibes.com": {"rate": 1.0, "max_rate": 4.0},
+    # Nominatim's usage policy allows at most one request per second.
+    "nominatim.openstreetmap.org": {"rate": 1.0, "max_rate": 1.0},
+}
+DEFAULT_RATE = {"rate": 2.0, "max_rate": 10.0}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 6
+
+# Consecutive failed requests (connection errors, timeouts or 5xx after all of
+# their retries) that open a host's circuit, and how long it stays open before a
+# probe request is let through. The cooldown doubles after every failed probe,
+# up to MAX_COOLDOWN.
+FAILURE_THRESHOLD = 5
+COOLDOWN = 30.0
+MAX_COOLDOWN = 600.0
+
+
+def parse_retry_after(value: str):
+    """Returns the Retry-After delay in seconds (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket whose rate adapts to the responses it sees.
+
+    Every healthy response raises the rate by `increase` (up to max_rate); every
+    throttled or failed one multiplies it by `decrease` (down to min_rate). A
+    Retry-After header pauses the bucket for the requested time.
+
+    Attributes:
+        rate (float): Current rate in requests per second.
+        min_rate (float): Lower bound for the rate.
+        max_rate (float): Upper bound for the rate.
+    """
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.1, max_rate: float = 10.0,
+                 increase: float = 0.05, decrease: float = 0.5, burst: float = 1.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Blocks until the caller may send one request."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait, reserved = self._blocked_until - now, False
+                else:
+                    self._refill(now)
+                    self._tokens -= 1
+                    wait, reserved = max(0.0, -self._tokens / self.rate), True
+            if wait > 0:
+                time.sleep(wait)
+            if reserved:
+                return
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: float = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host: str) -> AdaptiveRateLimiter:
+    """Returns the limiter shared by every worker sending requests to the host."""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter(**HOST_RATES.get(host, DEFAULT_RATE))
+        return _limiters[host]
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+    def __init__(self, host: str, retry_after: float, **kwargs):
+        super().__init__(f"Circuit open for {host}; retry in {retry_after:.0f}s", **kwargs)
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Thread-safe per-host circuit breaker.
+
+    Closed: requests flow and consecutive failures are counted. After
+    failure_threshold of them the circuit opens and requests fail immediately
+    for `cooldown` seconds. Then it is half-open: a single probe request is let
+    through; success closes the circuit, failure opens it again with the cooldown
+    doubled (up to max_cooldown).
+
+    Attributes:
+        host (str): Host the breaker guards (used in log messages).
+        state (str): "closed", "open" or "half-open".
+        failures (int): Consecutive failures seen while closed.
+    """
+
+    def __init__(self, host: str = "", failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown: float = COOLDOWN, max_cooldown: float = MAX_COOLDOWN):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a request may be sent now; in half-open state it reserves the probe."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() >= self._open_until:
+                self.state = "half-open"
+                self._probing = False
+            if self.state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until a request may be let through (0 when closed)."""
+        with self._lock:
+            if self.state == "closed":
+                return 0.0
+            if self.state == "open":
+                return max(0.0, self._open_until - time.monotonic())
+            return 1.0 if self._probing else 0.0
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                print(f"Circuit for {self.host} closed again.")
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+            self._cooldown = self.base_cooldown
+
+    def release(self) -> None:
+        """Gives back a half-open probe without recording an outcome (e.g. the request was interrupted)."""
+        with self._lock:
+            self._probing = False
+
+    def on_failure(self) -> None:
+        with self._lock:
+            if self.state == "half-open":
+                self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+            elif self.state == "closed":
+                self.failures += 1
+                if self.failures < self.failure_threshold:
+                    return
+            else:
+                return
+            self.state = "open"
+            self._probing = False
+            self._open_until = time.monotonic() + self._cooldown
+            print(f"Circuit for {self.host} opened for {self._cooldown:.0f}s after repeated failures.")
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str) -> CircuitBreaker:
+    """Returns the circuit breaker shared by every worker sending requests to the host."""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+class PacedAdapter(HTTPAdapter):
+    """
+    Transport adapter that paces requests with the host's AdaptiveRateLimiter and
+    retries 429/5xx responses and connection errors up to max_attempts times.
+
+    Every request goes through the host's CircuitBreaker: while the circuit is
+    open the adapter raises CircuitOpenError right away instead of retrying
+    against a dead host, and other hosts are unaffected. A request counts as one
+    failure only once its retries are exhausted, so a single broken URL cannot
+    open the circuit on its own; its last 5xx response is returned as usual.
+    """
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, **kwargs):
+        super().__init__(**kwargs)
+        self.max_attempts = max_attempts
+
+    def send(self, request, **kwargs):
+        host = urlparse(request.url).hostname
+        limiter = get_limiter(host)
+        breaker = get_breaker(host)
+        if not breaker.allow():
+            raise CircuitOpenError(host, breaker.retry_after(), request=request)
+        for attempt in range(1, self.max_attempts + 1):
+            limiter.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                limiter.on_throttle()
+                if attempt == self.max_attempts:
+                    breaker.on_failure()
+                    raise
+                print(f"Attempt {attempt} for {request.url} failed: {e}")
+                continue
+            except requests.RequestException:
+                # Not the host's fault (invalid URL, too many redirects, ...).
+                breaker.on_success()
+                raise
+            except BaseException:
+                # Interrupted or a bug: nothing is known about the host.
+                breaker.release()
+                raise
+
+            if response.status_code in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                limiter.on_throttle(retry_after)
+                if attempt < self.max_attempts:
+                    print(f"{response.status_code} from {request.url}; retrying at {limiter.rate:.2f} req/s...")
+                    response.close()
+                    continue
+                # 429 means the host is up but wants us to slow down; only 5xx counts against it.
+                if response.status_code >= 500:
+                    breaker.on_failure()
+                else:
+                    breaker.on_success()
+                return response
+
+            limiter.on_success()
+            breaker.on_success()
+            return response
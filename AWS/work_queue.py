@@ -0,0 +1,265 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+from caching import DEFAULT_CACHE_DIR
+from rate_limiter import CircuitOpenError
+
+DEFAULT_QUEUE_PATH = os.path.join(DEFAULT_CACHE_DIR, "work_queue.sqlite3")
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Delay before a failed task may be leased again; doubles with every attempt.
+RETRY_BACKOFF_SECONDS = 30
+
+
+class Task:
+    """
+    A leased crawl task.
+
+    Attributes:
+        id (int): Task id in the backend.
+        url (str): url.txt entry to scrape.
+        attempts (int): Times the task has been leased, including this one.
+        lease_token (str): Identifies this lease; a worker whose lease expired and
+            was handed to another worker can no longer complete or fail the task.
+    """
+
+    def __init__(self, id: int, url: str, attempts: int, lease_token: str):
+        self.id = id
+        self.url = url
+        self.attempts = attempts
+        self.lease_token = lease_token
+
+
+class WorkQueue(ABC):
+    """
+    Interface of a crawl work queue shared by many workers.
+
+    A task is leased to one worker at a time for lease_seconds. The worker
+    extends the lease with heartbeat() while it is busy; a lease that is not
+    extended expires and the task becomes available to other workers (e.g. after
+    the worker's host died). fail() puts the task back with a backoff until it
+    has been tried max_attempts times.
+
+    Backends for a fleet of hosts (SQS, DynamoDB, Redis, ...) subclass this and
+    implement every method; SqliteWorkQueue is the local implementation.
+    """
+
+    @abstractmethod
+    def put(self, urls) -> int:
+        """Adds the URLs that are not queued yet; returns how many were added."""
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """Leases the next available task to the worker, or returns None."""
+
+    @abstractmethod
+    def heartbeat(self, task: Task, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """Extends the lease; returns False if the task is no longer leased to the caller."""
+
+    @abstractmethod
+    def complete(self, task: Task) -> bool:
+        """Marks the task done; returns False if the lease was lost."""
+
+    @abstractmethod
+    def fail(self, task: Task, error: str = None) -> bool:
+        """Releases the task for a later retry; returns False if the lease was lost."""
+
+    @abstractmethod
+    def defer(self, task: Task, delay: float) -> bool:
+        """
+        Puts the task back for at least `delay` seconds without counting the
+        attempt (e.g. while its host's circuit is open); False if the lease was lost.
+        """
+
+    @abstractmethod
+    def counts(self) -> dict:
+        """Number of tasks per status ("pending", "leased", "done", "failed")."""
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    WorkQueue stored in an SQLite database, for worker processes and threads on one
+    host (or hosts sharing a filesystem with working locks). Leases are taken in
+    a single IMMEDIATE transaction, so two workers never receive the same task.
+
+    Attributes:
+        path (str): SQLite database file.
+        max_attempts (int): Leases per task before it is marked failed.
+    """
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY, url TEXT UNIQUE NOT NULL, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, available_at REAL NOT NULL DEFAULT 0, "
+                "lease_owner TEXT, lease_token TEXT, lease_expires REAL, last_error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, available_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; isolation_level=None lets us issue BEGIN IMMEDIATE.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, urls) -> int:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            added = 0
+            for url in urls:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tasks (url, status) VALUES (?, 'pending')", (url,))
+                added += cursor.rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Leases that ran out without a heartbeat count as a failed attempt.
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, lease_token = NULL, last_error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_expires < ?", (self.max_attempts, now))
+            row = conn.execute(
+                "SELECT id, url, attempts FROM tasks WHERE status = 'pending' AND available_at <= ? "
+                "ORDER BY available_at, id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_token = ?, lease_expires = ? WHERE id = ?",
+                (worker_id, token, now + lease_seconds, row[0]))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return Task(row[0], row[1], row[2] + 1, token)
+
+    def _update_leased(self, task: Task, assignments: str, params: tuple) -> bool:
+        cursor = self._connection().execute(
+            f"UPDATE tasks SET {assignments} WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            params + (task.id, task.lease_token))
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task: Task, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        return self._update_leased(task, "lease_expires = ?", (time.time() + lease_seconds,))
+
+    def complete(self, task: Task) -> bool:
+        return self._update_leased(
+            task, "status = 'done', lease_owner = NULL, lease_token = NULL, last_error = NULL", ())
+
+    def fail(self, task: Task, error: str = None) -> bool:
+        if task.attempts >= self.max_attempts:
+            return self._update_leased(
+                task, "status = 'failed', lease_owner = NULL, lease_token = NULL, last_error = ?", (error,))
+        retry_at = time.time() + RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+        return self._update_leased(
+            task, "status = 'pending', available_at = ?, lease_owner = NULL, lease_token = NULL, "
+                  "last_error = ?", (retry_at, error))
+
+    def defer(self, task: Task, delay: float) -> bool:
+        return self._update_leased(
+            task, "status = 'pending', attempts = attempts - 1, available_at = ?, lease_owner = NULL, "
+                  "lease_token = NULL", (time.time() + delay,))
+
+    def counts(self) -> dict:
+        counts = dict.fromkeys(("pending", "leased", "done", "failed"), 0)
+        for status, count in self._connection().execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[status] = count
+        return counts
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}"
+
+
+class Worker:
+    """
+    Pulls tasks from a WorkQueue and runs handler(url) on each, keeping the lease
+    alive with a heartbeat thread while the handler runs. Exceptions from the
+    handler fail the task so it is retried later (possibly by another worker);
+    CircuitOpenError defers it until the host's circuit may close, without
+    using up an attempt.
+
+    Attributes:
+        queue (WorkQueue): Queue shared with the other workers.
+        handler (callable): Called with the task's URL.
+        worker_id (str): Name recorded as the lease owner.
+        lease_seconds (float): Lease length; heartbeats renew it every third of it.
+        processed (int): Tasks completed by this worker.
+    """
+
+    def __init__(self, queue: WorkQueue, handler, worker_id: str = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        self.queue = queue
+        self.handler = handler
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.processed = 0
+
+    def _keep_alive(self, task: Task, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.heartbeat(task, self.lease_seconds):
+                print(f"[{self.worker_id}] Lost the lease on {task.url}.")
+                return
+
+    def run_task(self, task: Task) -> None:
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_alive, args=(task, stop), daemon=True)
+        heartbeat.start()
+        try:
+            self.handler(task.url)
+        except CircuitOpenError as e:
+            print(f"[{self.worker_id}] Deferring {task.url}: {e}")
+            self.queue.defer(task, e.retry_after)
+            return
+        except Exception as e:
+            print(f"[{self.worker_id}] Attempt {task.attempts} for {task.url} failed: {e}")
+            self.queue.fail(task, str(e))
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+        if self.queue.complete(task):
+            self.processed += 1
+
+    def run(self, poll_seconds: float = 5.0, stop_when_idle: bool = True) -> None:
+        """
+        Processes tasks until the queue has nothing pending or leased (or forever
+        if stop_when_idle is False), polling every poll_seconds while idle.
+        """
+        while True:
+            task = self.queue.lease(self.worker_id, self.lease_seconds)
+            if task is not None:
+                self.run_task(task)
+                continue
+            if stop_when_idle:
+                counts = self.queue.counts()
+                if counts["pending"] == 0 and counts["leased"] == 0:
+                    return
+            time.sleep(poll_seconds)
@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = ".cache"
+
+
+class SqliteCache:
+    """
+    Small on-disk key/value cache backed by SQLite.
+
+    Values are stored as JSON together with the time they were written, so callers
+    decide how old an entry may be. None is a valid value (used for negative caching).
+
+    Attributes:
+        path (str): SQLite database file.
+        table (str): Table holding this cache's entries.
+    """
+
+    def __init__(self, path: str, table: str = "entries"):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT, stored_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str):
+        """Returns (value, stored_at) for the key, or None if it was never stored."""
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def keys(self) -> list:
+        with self._lock:
+            rows = self._connection().execute(f"SELECT key FROM {self.table}").fetchall()
+        return [row[0] for row in rows]
+
+    def keys_where(self, field: str, value) -> list:
+        """Keys whose (dict) value has `value` under `field`."""
+        with self._lock:
+            rows = self._connection().execute(
+                f"SELECT key FROM {self.table} WHERE json_extract(value, ?) = ?", (f"$.{field}", value)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def values(self) -> list:
+        with self._lock:
+            rows = self._connection().execute(f"SELECT value FROM {self.table}").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        # The leader died without a result (KeyboardInterrupt, SystemExit, ...).
+        self.abandoned = False
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the function,
+    every other caller waiting on that key receives the same result (or exception).
+    If the leader is interrupted before it finishes, the waiting callers try again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.abandoned:
+                return self.do(key, func)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
@@ -0,0 +1,173 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from property_scraper import (
+    attach_neighborhood,
+    fetch_property_html,
+    iter_building_groups,
+    join_url_choice,
+    parse_property_html,
+    parse_property_rows,
+    split_url_choice,
+)
+from neighborhood_scraper import geocode_address, find_neighborhood_url, fetch_neighborhood_details
+from rate_limiter import get_breaker
+
+# Maximum number of simultaneous requests per host. "geocoder" covers the
+# Nominatim lookups, which must stay at a single request at a time.
+DEFAULT_HOST_LIMITS = {
+    "redfin.com": 8,
+    "areavibes.com": 4,
+    "geocoder": 1,
+}
+DEFAULT_LIMIT = 4
+
+# Host of the Areavibes search and neighborhood pages, for its circuit breaker.
+AREAVIBES_HOST = "www.areavibes.com"
+# Longest a task waits for a host's circuit to close before it is tried (and fails fast).
+MAX_PARK_SECONDS = 900
+
+
+def host_key(url: str) -> str:
+    """
+    Returns the host used for concurrency limits, e.g. "redfin.com" for
+    "https://www.redfin.com/WA/Seattle/...".
+    """
+    host = urlparse(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class Crawler:
+    """
+    Scrapes many url.txt entries at once with asyncio.
+
+    Each blocking step (property page, geocoding, Areavibes search and
+    neighborhood page) runs in a worker thread while holding the semaphore of
+    its host, so every host keeps its own concurrency cap. Rows are the same
+    dicts get_property_info(url, get_neighborhood_info) returns.
+
+    Attributes:
+        limits (dict): Concurrency cap per host key (see DEFAULT_HOST_LIMITS).
+        parser_backend (str): Parser backend passed to the extraction engine.
+        all_floor_plans (bool): Yield a row for every floor plan on each page
+            instead of the requested room choices.
+    """
+
+    def __init__(self, limits: dict = None, parser_backend: str = "html.parser",
+                 all_floor_plans: bool = False):
+        self.limits = {**DEFAULT_HOST_LIMITS, **(limits or {})}
+        self.parser_backend = parser_backend
+        self.all_floor_plans = all_floor_plans
+        self._semaphores = {}
+        self._executor = None
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.limits.get(host, DEFAULT_LIMIT))
+        return self._semaphores[host]
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _park(self, hostname: str) -> None:
+        """
+        Waits, without holding a thread or a host slot, while the circuit of the
+        host is open, so work for a failing host is deferred instead of failing
+        and work for healthy hosts keeps going.
+        """
+        breaker = get_breaker(hostname)
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + MAX_PARK_SECONDS
+        delay = breaker.retry_after()
+        while delay > 0 and loop.time() < give_up_at:
+            await asyncio.sleep(min(delay, give_up_at - loop.time()))
+            delay = breaker.retry_after()
+
+    async def _call(self, host: str, func, *args):
+        """Runs a blocking call in a worker thread under the host's cap."""
+        async with self._semaphore(host):
+            return await self._in_thread(func, *args)
+
+    async def get_property_info(self, url_full: str) -> dict:
+        """Async equivalent of property_scraper.get_property_info."""
+        url, choice = split_url_choice(url_full)
+        await self._park(urlparse(url).hostname)
+        html_content = await self._call(host_key(url), fetch_property_html, url)
+        if not html_content:
+            return {}
+
+        info = await self._in_thread(parse_property_html, html_content, choice, self.parser_backend)
+        info.update(await self.get_neighborhood_info(info["Address"]))
+        return info
+
+    async def get_property_rows(self, url: str, choices: list) -> list:
+        """Async equivalent of property_scraper.get_property_rows."""
+        await self._park(urlparse(url).hostname)
+        html_content = await self._call(host_key(url), fetch_property_html, url)
+        if not html_content:
+            return []
+
+        rows = await self._in_thread(parse_property_rows, html_content, choices,
+                                     self.parser_backend, self.all_floor_plans)
+        attach_neighborhood(rows, await self.get_neighborhood_info(rows[0].address))
+        return rows
+
+    async def get_neighborhood_info(self, address: str) -> dict:
+        """Async equivalent of neighborhood_scraper.get_neighborhood_info."""
+        location = await self._call("geocoder", geocode_address, address)
+        await self._park(AREAVIBES_HOST)
+        url = await self._call("areavibes.com", find_neighborhood_url, address, location)
+        return await self._call("areavibes.com", fetch_neighborhood_details, url)
+
+    async def _scrape(self, url: str, choices: list) -> tuple:
+        try:
+            rows = await self.get_property_rows(url, choices)
+        except Exception as e:
+            print(f"Error processing {url}: {e}")
+            rows = []
+        return url, [join_url_choice(url, choice) for choice in choices], rows
+
+    async def crawl_buildings(self, urls, concurrency: int = 16):
+        """
+        Scrapes the given url.txt entries, keeping up to `concurrency` buildings in
+        flight. Entries sharing a property URL are fetched and enriched once (see
+        iter_building_groups), and each building yields (url, entries, rows) in
+        completion order. Failed buildings yield no rows.
+        """
+        # Enough threads for every host to use its full cap at once.
+        self._executor = ThreadPoolExecutor(max_workers=max(concurrency, sum(self.limits.values())))
+        groups = iter_building_groups(urls)
+        pending = set()
+        try:
+            while True:
+                for url, choices in groups:
+                    pending.add(asyncio.create_task(self._scrape(url, choices)))
+                    if len(pending) >= concurrency:
+                        break
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def crawl(self, urls, concurrency: int = 16):
+        """
+        Same as crawl_buildings, but yields one (url, Listing) pair per row. Failed
+        entries yield None instead of a Listing.
+        """
+        async for url, entries, rows in self.crawl_buildings(urls, concurrency):
+            if not rows:
+                for entry in entries:
+                    yield entry, None
+            elif self.all_floor_plans:
+                for row in rows:
+                    yield url, row
+            else:
+                for pair in zip(entries, rows):
+                    yield pair
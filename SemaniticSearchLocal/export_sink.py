@@ -0,0 +1,133 @@
+import csv
+import json
+import os
+
+from listing import Listing
+
+
+class CheckpointedSink:
+    """
+    Streams scraped rows to CSV and NDJSON as soon as they complete.
+
+    Rows are appended to the NDJSON file and the CSV; the CSV header is the
+    union of every key seen so far, in first-seen order, and the CSV is
+    rebuilt from the NDJSON file on the rare occasion a row brings a new key.
+    After the rows of a url.txt entry are on disk, the entry is appended to a
+    journal together with the committed NDJSON size. A restarted run reloads
+    the journal, truncates anything written after the last commit, rebuilds
+    the CSV and skips the entries in `done`.
+
+    Attributes:
+        csv_path (str): CSV output.
+        ndjson_path (str): NDJSON output (one JSON row per line).
+        journal_path (str): Journal of finished url.txt entries.
+        fieldnames (list): Union of the row keys written so far.
+        done (set): Entries already exported (by this or an interrupted run). Any
+            container with add() and `in` works, e.g. url_stream.SeenSet for huge runs.
+        rows_written (int): Rows in the outputs, including resumed ones.
+    """
+
+    def __init__(self, csv_path: str = "exported_data.csv", ndjson_path: str = None,
+                 journal_path: str = None, resume: bool = True, done=None):
+        base = os.path.splitext(csv_path)[0]
+        self.csv_path = csv_path
+        self.ndjson_path = ndjson_path or base + ".ndjson"
+        self.journal_path = journal_path or base + ".journal"
+        self.fieldnames = []
+        self.done = set() if done is None else done
+        self.rows_written = 0
+
+        committed = self._read_journal() if resume else None
+        if committed is None:
+            self._ndjson = open(self.ndjson_path, "wb")
+            self._journal = open(self.journal_path, "w", encoding="utf-8")
+            self._open_csv("w")
+            return
+
+        self._ndjson = open(self.ndjson_path, "ab")
+        self._ndjson.truncate(committed)
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._rewrite_csv()
+
+    def _read_journal(self):
+        """Loads the finished entries; returns the committed NDJSON size, or None."""
+        if not os.path.exists(self.journal_path) or not os.path.exists(self.ndjson_path):
+            return None
+        committed = 0
+        valid_size = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line from a crash
+                record = json.loads(line)
+                self.done.add(record["url"])
+                committed = max(committed, record["offset"])
+                valid_size += len(line)
+        os.truncate(self.journal_path, valid_size)
+        return committed
+
+    def _open_csv(self, mode: str) -> None:
+        self._csv = open(self.csv_path, mode, newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._csv, fieldnames=self.fieldnames, restval="")
+        if mode == "w" and self.fieldnames:
+            self._writer.writeheader()
+
+    def _rewrite_csv(self) -> None:
+        """Rebuilds the CSV from the NDJSON file with the union of every key."""
+        self._ndjson.flush()
+        rows = 0
+        with open(self.ndjson_path, "rb") as f:
+            for line in f:
+                for key in json.loads(line):
+                    if key not in self.fieldnames:
+                        self.fieldnames.append(key)
+                rows += 1
+        self.rows_written = rows
+
+        if getattr(self, "_csv", None):
+            self._csv.close()
+        tmp_path = self.csv_path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+            writer = csv.DictWriter(out, fieldnames=self.fieldnames, restval="")
+            writer.writeheader()
+            with open(self.ndjson_path, "rb") as f:
+                for line in f:
+                    writer.writerow(json.loads(line))
+        os.replace(tmp_path, self.csv_path)
+        self._open_csv("a")
+
+    def write(self, entries: list, rows: list) -> None:
+        """
+        Appends the rows (Listing objects or dicts) of finished url.txt entries,
+        then journals the entries.
+        """
+        for row in rows:
+            if isinstance(row, Listing):
+                row = row.to_dict()
+            self._ndjson.write(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            if any(key not in self.fieldnames for key in row):
+                self._rewrite_csv()
+            else:
+                self._writer.writerow(row)
+                self.rows_written += 1
+        self._ndjson.flush()
+        os.fsync(self._ndjson.fileno())
+        self._csv.flush()
+
+        offset = self._ndjson.tell()
+        for entry in entries:
+            self._journal.write(json.dumps({"url": entry, "offset": offset}) + "\n")
+            self.done.add(entry)
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def close(self, completed: bool = False) -> None:
+        """
+        Closes the outputs. A completed run drops its journal so the next run
+        starts from scratch instead of resuming.
+        """
+        self._ndjson.close()
+        self._csv.close()
+        self._journal.close()
+        if completed:
+            os.remove(self.journal_path)
@@ -0,0 +1,307 @@
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+
+BACKENDS = ("html.parser", "lxml", "selectolax")
+
+
+class SoupNode:
+    """Wraps a BeautifulSoup element (html.parser or lxml tree builder)."""
+
+    def __init__(self, element):
+        self.element = element
+
+    def find(self, tag: str, class_: str = None):
+        found = self.element.find(tag, class_=class_) if class_ else self.element.find(tag)
+        return SoupNode(found) if found else None
+
+    def find_all(self, tag: str, class_: str = None) -> list:
+        found = self.element.find_all(tag, class_=class_) if class_ else self.element.find_all(tag)
+        return [SoupNode(element) for element in found]
+
+    @property
+    def text(self) -> str:
+        return self.element.text
+
+    def get(self, attribute: str):
+        return self.element.get(attribute)
+
+
+class SelectolaxNode:
+    """Wraps a selectolax node behind the same find/find_all/text interface."""
+
+    def __init__(self, node):
+        self.node = node
+
+    @staticmethod
+    def _selector(tag: str, class_: str = None) -> str:
+        if not class_:
+            return tag
+        return tag + "".join(f".{name}" for name in class_.split())
+
+    def find(self, tag: str, class_: str = None):
+        found = self.node.css_first(self._selector(tag, class_))
+        return SelectolaxNode(found) if found else None
+
+    def find_all(self, tag: str, class_: str = None) -> list:
+        return [SelectolaxNode(node) for node in self.node.css(self._selector(tag, class_))]
+
+    @property
+    def text(self) -> str:
+        return self.node.text(deep=True)
+
+    def get(self, attribute: str):
+        return self.node.attributes.get(attribute)
+
+
+def parse_document(html: str, backend: str = "html.parser"):
+    """Parses the HTML once with the given backend and returns the root node."""
+    if backend == "selectolax":
+        from selectolax.lexbor import LexborHTMLParser
+        return SelectolaxNode(LexborHTMLParser(html).root)
+    return SoupNode(BeautifulSoup(html, backend))
+
+
+def extract_name(doc, room_choice: str = None) -> dict:
+    """Parses the property name."""
+    element = doc.find("h1", class_="property-header")
+    return {"Building Name": element.text.strip() if element else "Name not found"}
+
+
+def extract_address(doc, room_choice: str = None) -> dict:
+    """Parses the property address."""
+    element = doc.find("h2", class_="full-address")
+    return {"Address": element.text.strip() if element else "Address not found"}
+
+
+ROOM_FIELDS = ("Room Title", "Bed/Baths", "Price", "Sqft", "Availability")
+
+
+def _empty_room_info() -> dict:
+    return {field: "None" for field in ROOM_FIELDS}
+
+
+def _parse_floor_plan(element, room_name: str) -> dict:
+    """Reads the details of one floorPlanInfo element."""
+    info = _empty_room_info()
+    details = element.find("div", class_="details")
+    price = element.find("div", class_="price")
+    available_count = element.find("div", class_="availableCount")
+
+    info["Room Title"] = room_name
+    if details and "·" in details.text:
+        parts = details.text.split("·")
+        if len(parts) >= 3:
+            info["Bed/Baths"] = parts[0].strip()
+            info["Sqft"] = parts[2].strip().replace("Sqft.", "").strip()
+    info["Price"] = price.text.strip() if price else "None"
+    info["Availability"] = available_count.text.strip() if available_count else "None"
+    return info
+
+
+def _floor_plan_elements(doc):
+    """Yields (room name, element) for every named floorPlanInfo element."""
+    for element in doc.find_all("div", class_="floorPlanInfo"):
+        name_div = element.find("div", class_="name")
+        if name_div:
+            yield name_div.text.strip(), element
+
+
+def extract_room_info(doc, room_choice: str = None) -> dict:
+    """
+    Parses the room (floor plan) details if a room choice was provided.
+    """
+    info = _empty_room_info()
+    if not room_choice:
+        return info
+
+    if not doc.find("div", class_="floorPlanInfo"):
+        print("No floorPlanInfo elements found.")
+        return info
+
+    for room_name, element in _floor_plan_elements(doc):
+        if room_name == room_choice:
+            return _parse_floor_plan(element, room_name)
+    return info
+
+
+def extract_floor_plans(doc, room_choice: str = None) -> dict:
+    """
+    Parses every floor plan on the page into a list of unit records with the
+    room fields (title, beds/baths, price, sqft, availability).
+    """
+    return {"Floor Plans": [_parse_floor_plan(element, room_name)
+                            for room_name, element in _floor_plan_elements(doc)]}
+
+
+def extract_amenities(doc, room_choice: str = None) -> dict:
+    """Parses the amenities data (pets, parking, lease terms) from the page."""
+    amenities = {
+        "Cats Allowed": False,
+        "Dogs Allowed": False,
+        "Cat Rent": None,
+        "Dog Rent": None,
+        "Parking Type": None,
+        "Parking Fee": None,
+        "Assigned Parking": None,
+        "EV Parking Fee": None,
+        "Lease Term": None,
+        "Application fee": None
+    }
+
+    for pet_block in doc.find_all("div", class_="PetsBlock"):
+        pet_type = pet_block.find("h3")
+        pet_rent = pet_block.find("div", class_="table-value")
+        if pet_type and "Cats welcome" in pet_type.text:
+            amenities["Cats Allowed"] = True
+            amenities["Cat Rent"] = pet_rent.text.strip() if pet_rent else None
+        if pet_type and "Dogs welcome" in pet_type.text:
+            amenities["Dogs Allowed"] = True
+            amenities["Dog Rent"] = pet_rent.text.strip() if pet_rent else None
+
+    parking_block = doc.find("div", class_="ParkingTypeBlock")
+    if parking_block:
+        for row in parking_block.find_all("div", class_="table-row"):
+            label = row.find("span", class_="table-label")
+            value = row.find("div", class_="table-value")
+            if label and value:
+                if "Type" in label.text:
+                    amenities["Parking Type"] = value.text.strip()
+                elif "Parking fee" in label.text:
+                    amenities["Parking Fee"] = value.text.strip()
+                elif "Assigned" in label.text:
+                    amenities["Assigned Parking"] = value.text.strip()
+
+        ev_parking_fee = parking_block.find("p", class_="comment")
+        if ev_parking_fee and "EV Spots Available" in ev_parking_fee.text:
+            amenities["EV Parking Fee"] = ev_parking_fee.text.split("for ")[-1].strip()
+
+    lease_term = doc.find("div", class_="LeaseTermBlock")
+    if lease_term:
+        for row in lease_term.find_all("div", class_="table-row"):
+            label = row.find("span", class_="table-label")
+            value = row.find("div", class_="table-value")
+            if label and value:
+                key = label.text.strip()
+                val = value.text.strip()
+                if key == "Term type":
+                    amenities["Lease Term"] = val
+                elif key == "Application fee":
+                    amenities["Application fee"] = val
+
+    return amenities
+
+
+DEFAULT_EXTRACTORS = (
+    ("name", extract_name),
+    ("address", extract_address),
+    ("room_info", extract_room_info),
+    ("amenities", extract_amenities),
+)
+
+# Same fields plus a "Floor Plans" list holding every unit on the page.
+FLOOR_PLAN_EXTRACTORS = DEFAULT_EXTRACTORS + (("floor_plans", extract_floor_plans),)
+
+
+def unit_rows(fields: dict) -> list:
+    """
+    Flattens the output of FLOOR_PLAN_EXTRACTORS into one row per unit: the
+    building fields with the room fields of that unit. A page without floor
+    plans gives a single row with empty room fields.
+    """
+    building = {key: value for key, value in fields.items() if key != "Floor Plans"}
+    units = fields.get("Floor Plans") or [_empty_room_info()]
+    rows = []
+    for unit in units:
+        row = dict(building)
+        row.update(unit)
+        rows.append(row)
+    return rows
+
+
+class ExtractionResult:
+    """
+    Output of one extraction run.
+
+    Attributes:
+        fields (dict): Merged output of every extractor, in extractor order.
+        timings (dict): Seconds spent in "parse", in each extractor, and in "total".
+    """
+
+    def __init__(self, fields: dict, timings: dict):
+        self.fields = fields
+        self.timings = timings
+
+
+class ExtractionEngine:
+    """
+    Parses a property page once and runs every field extractor against that tree.
+
+    Attributes:
+        backend (str): Parser backend, one of "html.parser", "lxml" or "selectolax".
+        extractors (tuple): (name, callable) pairs; each callable takes the parsed
+            document and the room choice and returns a dict of fields.
+    """
+
+    def __init__(self, backend: str = "html.parser", extractors=DEFAULT_EXTRACTORS):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown parser backend '{backend}'. Expected one of {BACKENDS}.")
+        self.backend = backend
+        self.extractors = tuple(extractors)
+
+    def parse(self, html: str):
+        """Builds the document tree for the page."""
+        return parse_document(html, self.backend)
+
+    def extract(self, html: str, room_choice: str = None) -> ExtractionResult:
+        """Parses the page once and runs each extractor, timing every step."""
+        started = time.perf_counter()
+        doc = self.parse(html)
+        return self.extract_parsed(doc, room_choice, time.perf_counter() - started)
+
+    def extract_parsed(self, doc, room_choice: str = None, parse_seconds: float = 0.0) -> ExtractionResult:
+        """Runs each extractor on a document parsed earlier (in parse_seconds)."""
+        started = time.perf_counter()
+        timings = {"parse": parse_seconds}
+        fields = self.run(doc, room_choice, timings)
+        timings["total"] = parse_seconds + time.perf_counter() - started
+        return ExtractionResult(fields, timings)
+
+    def run(self, doc, room_choice: str = None, timings: dict = None) -> dict:
+        """Runs the extractors against an already parsed document."""
+        fields = {}
+        for name, extractor in self.extractors:
+            step_started = time.perf_counter()
+            fields.update(extractor(doc, room_choice))
+            if timings is not None:
+                timings[name] = time.perf_counter() - step_started
+        return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time the extraction engine on saved property pages."
+    )
+    parser.add_argument("html_files", nargs="+", help="Saved Redfin property pages.")
+    parser.add_argument("--backend", "-b", choices=BACKENDS, default="html.parser",
+                        help="Parser backend to use.")
+    parser.add_argument("--room", "-r", help="Room choice to extract, e.g. '1x1 D'.")
+    parser.add_argument("--all-floor-plans", action="store_true",
+                        help="Also extract every floor plan on the page.")
+    args = parser.parse_args()
+
+    extractors = FLOOR_PLAN_EXTRACTORS if args.all_floor_plans else DEFAULT_EXTRACTORS
+    engine = ExtractionEngine(args.backend, extractors)
+    for html_file in args.html_files:
+        with open(html_file, "r", encoding="utf-8") as f:
+            html = f.read()
+        result = engine.extract(html, args.room)
+        print(f"\n{html_file} ({args.backend})")
+        for step, seconds in result.timings.items():
+            print(f"  {step:<10} {seconds * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
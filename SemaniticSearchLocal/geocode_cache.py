@@ -0,0 +1,124 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+
+from caching import DEFAULT_CACHE_DIR, SingleFlight, SqliteCache
+from rate_limiter import get_limiter
+
+DEFAULT_GEOCODE_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "geocode.sqlite3")
+DEFAULT_TTL = 180 * 24 * 3600          # buildings do not move
+DEFAULT_NEGATIVE_TTL = 7 * 24 * 3600   # retry "not found" addresses weekly
+
+_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr",
+    "lane": "ln", "place": "pl", "court": "ct", "terrace": "ter", "parkway": "pkwy",
+    "highway": "hwy", "square": "sq", "circle": "cir", "north": "n", "south": "s",
+    "east": "e", "west": "w", "northeast": "ne", "northwest": "nw", "southeast": "se",
+    "southwest": "sw", "apartment": "apt", "suite": "ste",
+}
+_COUNTRY_PARTS = {"usa", "us", "united states", "united states of america"}
+
+
+def canonicalize_address(address: str) -> str:
+    """
+    Normalizes an address so spelling variants share one cache key, e.g.
+    "200 2nd Avenue West,Seattle, WA 98119-1234, USA" -> "200 2nd ave w, seattle, wa 98119".
+    """
+    text = unicodedata.normalize("NFKC", address).lower()
+    text = re.sub(r"\b(\d{5})-\d{4}\b", r"\1", text)
+    parts = []
+    for part in text.split(","):
+        tokens = re.sub(r"[^\w\s-]", " ", part).split()
+        part = " ".join(_ABBREVIATIONS.get(token, token) for token in tokens)
+        if part and part not in _COUNTRY_PARTS:
+            parts.append(part)
+    return ", ".join(parts)
+
+
+class CachedLocation:
+    """Geocoding result with the attributes the scrapers read from geopy's Location."""
+
+    def __init__(self, latitude: float, longitude: float, address: str):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.address = address
+
+    def to_dict(self) -> dict:
+        return {"latitude": self.latitude, "longitude": self.longitude, "address": self.address}
+
+
+class GeocodeReplayError(LookupError):
+    """Raised in replay mode for an address that is not in the geocode cache."""
+
+
+class GeocodeCache:
+    """
+    Persistent geocoding cache in front of a geopy geocoder (Nominatim).
+
+    Results are keyed on the canonicalized address and kept on disk for `ttl`
+    seconds; addresses the geocoder could not resolve are remembered for
+    `negative_ttl` seconds. Within a run each address is looked up once, and
+    concurrent lookups of the same address share a single geocoder call, paced
+    at Nominatim's one request per second.
+
+    In replay mode the geocoder is never called: cached results are used
+    whatever their age, and an address missing from the cache raises
+    GeocodeReplayError.
+
+    Attributes:
+        geolocator: geopy geocoder used for addresses not in the cache.
+        replay (bool): Answer from the cache only. Set on the class by
+            http_session.set_replay_mode so it covers every cache.
+        stats (dict): Number of lookups answered from memory, from disk and by the geocoder.
+    """
+
+    replay = False
+
+    def __init__(self, geolocator, path: str = DEFAULT_GEOCODE_CACHE_PATH,
+                 ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        self.geolocator = geolocator
+        self.store = SqliteCache(path, table="geocodes")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stats = {"memory": 0, "disk": 0, "geocoder": 0}
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.limiter = get_limiter("nominatim.openstreetmap.org")
+
+    def geocode(self, address: str):
+        """Returns a CachedLocation for the address, or None if it cannot be geocoded."""
+        key = canonicalize_address(address)
+        with self._memo_lock:
+            if key in self._memo:
+                self.stats["memory"] += 1
+                return self._memo[key]
+
+        location = self._flight.do(key, lambda: self._lookup(key, address))
+        with self._memo_lock:
+            self._memo[key] = location
+        return location
+
+    def _lookup(self, key: str, address: str):
+        entry = self.store.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if self.replay or time.time() - stored_at <= (self.ttl if value else self.negative_ttl):
+                self.stats["disk"] += 1
+                return CachedLocation(**value) if value else None
+        if self.replay:
+            raise GeocodeReplayError(f"{address!r} is not in the geocode cache (replay mode).")
+
+        self.stats["geocoder"] += 1
+        self.limiter.acquire()
+        try:
+            location = self.geolocator.geocode(address)
+        except Exception as e:
+            self.limiter.on_throttle(getattr(e, "retry_after", None))
+            raise
+        self.limiter.on_success()
+        result = CachedLocation(location.latitude, location.longitude, location.address) if location else None
+        self.store.set(key, result.to_dict() if result else None)
+        return result
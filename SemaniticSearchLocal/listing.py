@@ -0,0 +1,246 @@
+import json
+import re
+
+# (attribute, output label) of the property and unit fields, in output order.
+PROPERTY_FIELDS = (
+    ("building_name", "Building Name"),
+    ("address", "Address"),
+    ("room_title", "Room Title"),
+    ("bed_baths", "Bed/Baths"),
+    ("price", "Price"),
+    ("price_max", "Price Max"),
+    ("sqft", "Sqft"),
+    ("sqft_max", "Sqft Max"),
+    ("availability", "Availability"),
+    ("cats_allowed", "Cats Allowed"),
+    ("dogs_allowed", "Dogs Allowed"),
+    ("cat_rent", "Cat Rent"),
+    ("dog_rent", "Dog Rent"),
+    ("parking_type", "Parking Type"),
+    ("parking_fee", "Parking Fee"),
+    ("assigned_parking", "Assigned Parking"),
+    ("ev_parking_fee", "EV Parking Fee"),
+    ("lease_term", "Lease Term"),
+    ("application_fee", "Application fee"),
+)
+# Dollar amounts ("$2,100", "$40/mo", "$275 per Month") are stored as ints.
+MONEY_FIELDS = frozenset(("price", "price_max", "cat_rent", "dog_rent", "parking_fee", "ev_parking_fee",
+                          "application_fee"))
+INT_FIELDS = frozenset(("sqft", "sqft_max"))
+# Fields scraped as ranges ("$3,100 - $3,400", "553 - 600"): the low end is kept in
+# the field itself and the high end in its "_max" companion (None for a single value).
+RANGE_FIELDS = {"price": "price_max", "sqft": "sqft_max"}
+BOOL_FIELDS = frozenset(("cats_allowed", "dogs_allowed"))
+
+# Areavibes category grades ("A+", "F", ...). The page names them in lower case
+# ("cost of living") while the defaults used title case ("Cost Of Living").
+GRADE_FIELDS = (
+    ("amenities", "Amenities"),
+    ("commute", "Commute"),
+    ("cost_of_living", "Cost Of Living"),
+    ("crime", "Crime"),
+    ("employment", "Employment"),
+    ("health", "Health"),
+    ("housing", "Housing"),
+    ("schools", "Schools"),
+    ("ratings", "Ratings"),
+)
+# Areavibes sub-category entries, scraped as "(<count>) <grade>", e.g. "(26) A+".
+SCORE_FIELDS = (
+    ("coffee", "Coffee"),
+    ("entertainment", "Entertainment"),
+    ("food_and_drink", "Food and Drink"),
+    ("fitness", "Fitness"),
+    ("groceries", "Groceries"),
+    ("parks", "Parks"),
+    ("shops", "Shops"),
+    ("public_transit_stops", "Public Transit Stops"),
+    ("workers_taking_public_transit", "Workers Taking Public Transit"),
+    ("cost_of_living_index", "Cost of Living"),
+    ("tax_rates", "Tax Rates"),
+    ("property_crime", "Property Crime"),
+    ("violent_crime", "Violent Crime"),
+    ("median_household_income", "Med. Household Income"),
+    ("unemployment_rate", "Unemployment Rate"),
+    ("health_and_safety", "Health & Safety"),
+    ("air_quality", "Air Quality"),
+    ("home_price", "Home Price"),
+    ("home_appreciation_rate", "Home Appreciation Rate"),
+    ("home_affordability", "Home Affordability"),
+    ("school_test_scores", "School Test Scores"),
+    ("high_school_grad_rates", "High School Grad. Rates"),
+    ("elementary_schools", "Elementary Schools"),
+    ("high_schools", "High Schools"),
+    ("user_reviews", "User Reviews"),
+    ("user_surveys", "User Surveys"),
+)
+
+_PROPERTY_LABELS = {label: name for name, label in PROPERTY_FIELDS}
+_GRADE_LABELS = {label.lower(): name for name, label in GRADE_FIELDS}
+_SCORE_LABELS = {label: name for name, label in SCORE_FIELDS}
+_MISSING = ("", "None", "N/A", "n/a")
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_SCORE = re.compile(r"^\((?P<count>[^)]*)\)\s*(?P<grade>.*)$")
+
+
+def parse_text(value):
+    """Returns the stripped string, or None for the scrapers' missing-value markers."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value in _MISSING else value
+
+
+def parse_number(value):
+    """First number in the value as an int (or float), e.g. "$2,100/mo" -> 2100."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    match = _NUMBER.search(str(value))
+    if not match:
+        return None
+    number = match.group().replace(",", "")
+    return float(number) if "." in number else int(number)
+
+
+def parse_range(value):
+    """Low and high number of a range, e.g. "$3,100 - $3,400" -> (3100, 3400).
+
+    A single value gives (value, None).
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return parse_number(value), None
+    numbers = [parse_number(number) for number in _NUMBER.findall(str(value))]
+    if not numbers:
+        return None, None
+    high = max(numbers)
+    return numbers[0], high if high != numbers[0] else None
+
+
+def parse_bool(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    return str(value).strip().lower() == "true"
+
+
+def parse_score(value):
+    """Splits "(26) A+" into (26, "A+"); missing parts are None."""
+    if isinstance(value, (tuple, list)):
+        return tuple(value)
+    value = parse_text(value)
+    if value is None:
+        return None
+    match = _SCORE.match(value)
+    if not match:
+        return None, value
+    return parse_number(match.group("count")), parse_text(match.group("grade"))
+
+
+class NeighborhoodMetrics:
+    """
+    Areavibes metrics of one neighborhood, shared by every listing in it.
+
+    Attributes:
+        livability (int): Livability score out of 100.
+        amenities, commute, ... ratings (str): Category grades (see GRADE_FIELDS).
+        coffee, entertainment, ... user_surveys (tuple): (count, grade) of each
+            sub-category (see SCORE_FIELDS).
+        extra (dict): Entries the page had that are not in the canonical set, or None.
+    """
+
+    __slots__ = ("livability",) + tuple(name for name, _ in GRADE_FIELDS) \
+        + tuple(name for name, _ in SCORE_FIELDS) + ("extra",)
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    @classmethod
+    def from_info(cls, info: dict) -> "NeighborhoodMetrics":
+        """Builds the metrics from the dict returned by get_neighborhood_info."""
+        metrics = cls()
+        for key, value in info.items():
+            text = parse_text(value)
+            if key == "Livability":
+                metrics.livability = parse_number(text)
+            elif text is not None and text.startswith("(") and key in _SCORE_LABELS:
+                setattr(metrics, _SCORE_LABELS[key], parse_score(text))
+            elif key.lower() in _GRADE_LABELS:
+                # Title-case defaults are "N/A"; never let them hide a real grade.
+                if text is not None:
+                    setattr(metrics, _GRADE_LABELS[key.lower()], text)
+            elif text is not None:
+                if metrics.extra is None:
+                    metrics.extra = {}
+                metrics.extra[key] = text
+        return metrics
+
+    def to_dict(self) -> dict:
+        """Flat dict with the output labels; sub-categories become "<label>" and "<label> Count"."""
+        row = {"Livability": self.livability}
+        for name, label in GRADE_FIELDS:
+            row[label] = getattr(self, name)
+        for name, label in SCORE_FIELDS:
+            count, grade = getattr(self, name) or (None, None)
+            row[label] = grade
+            row[f"{label} Count"] = count
+        if self.extra:
+            row.update(self.extra)
+        return row
+
+
+class Listing:
+    """
+    One scraped unit (or building, when no room was chosen) with its neighborhood.
+
+    Values are typed: prices, rents and fees are ints in dollars, sqft is an int,
+    pet flags are bools and missing values are None. A price or sqft range keeps
+    its low end in price/sqft and its high end in price_max/sqft_max. The neighborhood metrics
+    object is shared by every unit of a building.
+
+    Attributes:
+        building_name, address, ... application_fee: See PROPERTY_FIELDS.
+        neighborhood (NeighborhoodMetrics): Metrics of the address, or None.
+    """
+
+    __slots__ = tuple(name for name, _ in PROPERTY_FIELDS) + ("neighborhood",)
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    @classmethod
+    def from_fields(cls, fields: dict, neighborhood: NeighborhoodMetrics = None) -> "Listing":
+        """Builds a listing from the extraction engine's output (see extraction.py)."""
+        listing = cls()
+        for label, value in fields.items():
+            name = _PROPERTY_LABELS.get(label)
+            if name is None:
+                continue
+            if name in RANGE_FIELDS:
+                value, high = parse_range(parse_text(value))
+                if high is not None:
+                    setattr(listing, RANGE_FIELDS[name], high)
+            elif name in MONEY_FIELDS or name in INT_FIELDS:
+                value = parse_number(parse_text(value))
+            elif name in BOOL_FIELDS:
+                value = parse_bool(value)
+            else:
+                value = parse_text(value)
+            setattr(listing, name, value)
+        listing.neighborhood = neighborhood
+        return listing
+
+    def to_dict(self) -> dict:
+        """Flat dict with the output labels, for the CSV/NDJSON writers."""
+        row = {label: getattr(self, name) for name, label in PROPERTY_FIELDS}
+        if self.neighborhood is not None:
+            row.update(self.neighborhood.to_dict())
+        return row
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __repr__(self) -> str:
+        return f"Listing({self.building_name!r}, {self.room_title!r}, price={self.price!r})"
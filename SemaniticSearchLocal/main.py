@@ -1,43 +1,107 @@
-import csv
-from property_scraper import get_property_info
+import argparse
+import asyncio
+import os
+from crawler import Crawler
+from export_sink import CheckpointedSink
+from http_session import set_replay_mode
+from pipeline import StagedCrawler
+from property_scraper import get_property_rows, iter_building_groups, join_url_choice
 from neighborhood_scraper import get_neighborhood_info
+from url_stream import SeenSet, iter_url_file, unique_entries
+
+async def crawl_urls(urls, args, sink: CheckpointedSink) -> None:
+    """
+    Scrapes the URLs concurrently, writing each building's rows as soon as it completes.
+    """
+    limits = {
+        "redfin.com": args.redfin_limit,
+        "areavibes.com": args.areavibes_limit,
+        "geocoder": args.geocoder_limit,
+    }
+    if args.pipeline:
+        crawler = StagedCrawler(limits, args.parser, args.all_floor_plans,
+                                parse_processes=args.parse_processes, report_every=10)
+    else:
+        crawler = Crawler(limits, args.parser, args.all_floor_plans)
+    async for url, entries, rows in crawler.crawl_buildings(urls, concurrency=args.concurrency):
+        print(f"\nFinished URL: {url}")
+        if rows:
+            sink.write(entries, rows)
 
 def main():
-    # Read URLs from url.txt (each URL on a new line)
-    try:
-        with open("url.txt", "r", encoding="utf-8") as f:
-            urls = [line.strip() for line in f if line.strip()]
-    except FileNotFoundError:
+    parser = argparse.ArgumentParser(description="Scrape the properties listed in url.txt.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Crawl the URLs concurrently with per-host limits.")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="Maximum number of URLs in flight in --async mode.")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Like --async, but parse pages in a pool of processes (fetch -> parse -> enrich -> write).")
+    parser.add_argument("--parse-processes", type=int, default=None,
+                        help="Parser processes in --pipeline mode (default: number of cores).")
+    parser.add_argument("--redfin-limit", type=int, default=8,
+                        help="Maximum simultaneous requests to redfin.com.")
+    parser.add_argument("--areavibes-limit", type=int, default=4,
+                        help="Maximum simultaneous requests to areavibes.com.")
+    parser.add_argument("--geocoder-limit", type=int, default=1,
+                        help="Maximum simultaneous geocoder lookups.")
+    parser.add_argument("--parser", default="html.parser", choices=["html.parser", "lxml", "selectolax"],
+                        help="HTML parser backend.")
+    parser.add_argument("--all-floor-plans", action="store_true",
+                        help="Write a row for every floor plan on each page instead of the room choices.")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard the journal of an interrupted run instead of resuming it.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-parse pages from the local page store without fetching them.")
+    args = parser.parse_args()
+    if args.replay:
+        set_replay_mode()
+
+    # url.txt is read lazily and deduplicated on disk, so memory stays flat no matter
+    # how many entries it holds.
+    if not os.path.exists("url.txt"):
         # If url.txt doesn't exist, create it with a default URL
-        urls = ["https://www.redfin.com/WA/Seattle/2nd-and-John/apartment/145726232 1x1+D D"]
         with open("url.txt", "w", encoding="utf-8") as f:
-            for url in urls:
-                f.write(url + "\n")
+            f.write("https://www.redfin.com/WA/Seattle/2nd-and-John/apartment/145726232 1x1+D D\n")
         print("url.txt not found. A default URL has been added.")
 
-    all_data = []
-    for url in urls:
-        print(f"\nProcessing URL: {url}")
-        data = get_property_info(url, get_neighborhood_info)
-        if data:
-            all_data.append(data)
-
-    # Save the scraped data to a CSV file
-    if all_data:
-        keys = all_data[0].keys()
-        with open("exported_data.csv", "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=keys)
-            writer.writeheader()
-            writer.writerows(all_data)
-        print("\nData has been saved to 'exported_data.csv'.")
+    # Rows are streamed to exported_data.csv/.ndjson as they complete. If a previous
+    # run was interrupted, the entries it already exported are skipped.
+    seen = SeenSet()
+    done = SeenSet()
+    sink = CheckpointedSink("exported_data.csv", resume=not args.restart, done=done)
+    skipped = [0]
+
+    def pending_urls():
+        for url in unique_entries(iter_url_file("url.txt"), seen):
+            if url in sink.done:
+                skipped[0] += 1
+                continue
+            yield url
+
+    completed = False
+    try:
+        if args.use_async or args.pipeline:
+            asyncio.run(crawl_urls(pending_urls(), args, sink))
+        else:
+            # Entries that share a building are fetched and enriched once.
+            for url, choices in iter_building_groups(pending_urls()):
+                print(f"\nProcessing URL: {url} ({len(choices)} room choice(s))")
+                rows = get_property_rows(url, choices, get_neighborhood_info, args.parser,
+                                         args.all_floor_plans)
+                if rows:
+                    sink.write([join_url_choice(url, choice) for choice in choices], rows)
+        completed = True
+    finally:
+        sink.close(completed)
+        seen.close()
+        done.close()
+
+    if skipped[0]:
+        print(f"Resumed an interrupted run: skipped {skipped[0]} entries already exported.")
+    if sink.rows_written:
+        print(f"\n{sink.rows_written} rows have been saved to 'exported_data.csv' and 'exported_data.ndjson'.")
     else:
         print("No data was scraped to save.")
 
-    # Write (or re-write) the URLs into url.txt to ensure they are stored locally
-    with open("url.txt", "w", encoding="utf-8") as f:
-        for url in urls:
-            f.write(url + "\n")
-    print("The URLs have been saved to 'url.txt'.")
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import time
+
+from caching import DEFAULT_CACHE_DIR, SqliteCache
+from http_session import set_replay_mode
+from neighborhood_scraper import get_neighborhood_info
+from property_scraper import attach_neighborhood, fetch_property_html, group_by_building, parse_property_rows
+
+DEFAULT_MONITOR_PATH = os.path.join(DEFAULT_CACHE_DIR, "monitor.sqlite3")
+
+# Polling interval bounds in seconds. A listing's interval halves every time it
+# is seen changing and grows by half every time it is not, within these bounds.
+MIN_INTERVAL = 15 * 60
+MAX_INTERVAL = 24 * 3600
+INITIAL_INTERVAL = 3600
+SPEEDUP = 0.5
+SLOWDOWN = 1.5
+
+# How often url.txt is checked for added or removed entries, in seconds.
+RELOAD_SECONDS = 60
+
+
+def content_hash(data) -> str:
+    """SHA-256 of a page (str/bytes) or of a JSON-serializable record."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    elif not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class ListingMonitor:
+    """
+    Long-running monitor that re-polls every building in url.txt on its own schedule.
+
+    Each poll hashes the fetched page. An identical page is not parsed at all;
+    otherwise the rows are extracted and hashed, and only rows that differ from
+    the last snapshot are enriched and appended to the change log. Every poll
+    that finds a change shortens the listing's interval, every poll that does
+    not lengthens it, so busy listings are polled often and quiet ones rarely.
+    The schedule survives restarts in an SQLite table.
+
+    Attributes:
+        url_file (str): url.txt to monitor; re-read when it changes.
+        output_path (str): NDJSON change log, one row per unit per detected change.
+        min_interval (float): Shortest polling interval in seconds.
+        max_interval (float): Longest polling interval in seconds.
+        initial_interval (float): Interval of a listing seen for the first time.
+        parser_backend (str): Parser backend passed to the extraction engine.
+        all_floor_plans (bool): Track every floor plan instead of the room choices.
+        stats (dict): Counts of "checks", "unchanged_pages", "unchanged_records",
+            "changes" and "errors" since start.
+    """
+
+    def __init__(self, url_file: str = "url.txt", output_path: str = "listing_changes.ndjson",
+                 path: str = DEFAULT_MONITOR_PATH, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, initial_interval: float = INITIAL_INTERVAL,
+                 parser_backend: str = "html.parser", all_floor_plans: bool = False):
+        self.url_file = url_file
+        self.output_path = output_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.parser_backend = parser_backend
+        self.all_floor_plans = all_floor_plans
+        self.store = SqliteCache(path, table="listings")
+        self.stats = {"checks": 0, "unchanged_pages": 0, "unchanged_records": 0, "changes": 0, "errors": 0}
+        self.groups = {}
+        self._queue = []
+        self._url_file_mtime = None
+
+    def _state(self, url: str) -> dict:
+        entry = self.store.get(url)
+        if entry:
+            return entry[0]
+        return {"interval": self.initial_interval, "next_check": 0.0, "page_hash": None,
+                "record_hash": None, "choices": None, "checks": 0, "changes": 0}
+
+    def reload(self) -> None:
+        """Re-reads url.txt if it changed and schedules buildings not yet queued."""
+        try:
+            mtime = os.path.getmtime(self.url_file)
+        except OSError:
+            return
+        if mtime == self._url_file_mtime:
+            return
+        self._url_file_mtime = mtime
+        with open(self.url_file, "r", encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip()]
+
+        queued = set(self.groups)
+        self.groups = dict(group_by_building(urls))
+        for url in self.groups:
+            if url not in queued:
+                heapq.heappush(self._queue, (self._state(url)["next_check"], url))
+        print(f"Monitoring {len(self.groups)} buildings from {self.url_file}.")
+
+    def check(self, url: str, choices: list) -> bool:
+        """Polls one building; returns True if its rows changed since the last snapshot."""
+        state = self._state(url)
+        now = time.time()
+        self.stats["checks"] += 1
+        state["checks"] += 1
+
+        html_content = fetch_property_html(url)
+        if not html_content:
+            self.stats["errors"] += 1
+            state["next_check"] = now + state["interval"]
+            self.store.set(url, state)
+            return False
+
+        page_hash = content_hash(html_content)
+        # The first snapshot is a baseline and leaves the interval alone.
+        first_snapshot = state["record_hash"] is None
+        changed = False
+        if page_hash == state["page_hash"] and choices == state["choices"]:
+            self.stats["unchanged_pages"] += 1
+        else:
+            rows = parse_property_rows(html_content, choices, self.parser_backend, self.all_floor_plans)
+            record_hash = content_hash([row.to_dict() for row in rows])
+            if record_hash == state["record_hash"]:
+                self.stats["unchanged_records"] += 1
+            else:
+                attach_neighborhood(rows, get_neighborhood_info(rows[0].address))
+                self._write(url, rows, now)
+                state["record_hash"] = record_hash
+                changed = not first_snapshot
+                self.stats["changes"] += 1
+            state["page_hash"] = page_hash
+            state["choices"] = choices
+
+        if changed:
+            state["changes"] += 1
+            state["interval"] = max(self.min_interval, state["interval"] * SPEEDUP)
+        elif not first_snapshot:
+            state["interval"] = min(self.max_interval, state["interval"] * SLOWDOWN)
+        state["next_check"] = now + state["interval"]
+        self.store.set(url, state)
+        return changed
+
+    def _write(self, url: str, rows: list, checked_at: float) -> None:
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                record = {"URL": url, "Checked At": checked_at, **row.to_dict()}
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def run(self, once: bool = False) -> None:
+        """
+        Polls buildings as they come due, sleeping in between. With once=True
+        it returns after every building that is currently due has been polled.
+        """
+        self.reload()
+        last_reload = time.monotonic()
+        while self._queue:
+            if time.monotonic() - last_reload >= RELOAD_SECONDS:
+                self.reload()
+                last_reload = time.monotonic()
+
+            due_at, url = self._queue[0]
+            if url not in self.groups or due_at != self._state(url)["next_check"]:
+                heapq.heappop(self._queue)  # removed from url.txt, or a stale duplicate
+                continue
+            wait = due_at - time.time()
+            if wait > 0:
+                if once:
+                    break
+                time.sleep(min(wait, RELOAD_SECONDS))
+                continue
+
+            heapq.heappop(self._queue)
+            try:
+                changed = self.check(url, self.groups[url])
+            except Exception as e:
+                print(f"Error checking {url}: {e}")
+                self.stats["errors"] += 1
+                changed = False
+                state = self._state(url)
+                state["next_check"] = time.time() + state["interval"]
+                self.store.set(url, state)
+            state = self._state(url)
+            print(f"{'Changed' if changed else 'Checked'}: {url} "
+                  f"(next check in {state['interval'] / 60:.0f} min)")
+            heapq.heappush(self._queue, (state["next_check"], url))
+        print(f"Monitor stats: {self.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-poll the listings in url.txt and log their changes.")
+    parser.add_argument("--url-file", default="url.txt", help="File with the tracked url.txt entries.")
+    parser.add_argument("--output", default="listing_changes.ndjson", help="NDJSON change log.")
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL / 60,
+                        help="Shortest polling interval in minutes.")
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL / 60,
+                        help="Longest polling interval in minutes.")
+    parser.add_argument("--initial-interval", type=float, default=INITIAL_INTERVAL / 60,
+                        help="Polling interval of newly tracked listings in minutes.")
+    parser.add_argument("--parser", default="html.parser", choices=["html.parser", "lxml", "selectolax"],
+                        help="HTML parser backend.")
+    parser.add_argument("--all-floor-plans", action="store_true",
+                        help="Track every floor plan on each page instead of the room choices.")
+    parser.add_argument("--once", action="store_true",
+                        help="Poll the listings that are due and exit (e.g. from cron).")
+    parser.add_argument("--replay", action="store_true",
+                        help="Poll the local page store instead of the network.")
+    args = parser.parse_args()
+    if args.replay:
+        set_replay_mode()
+
+    monitor = ListingMonitor(
+        url_file=args.url_file,
+        output_path=args.output,
+        min_interval=args.min_interval * 60,
+        max_interval=args.max_interval * 60,
+        initial_interval=args.initial_interval * 60,
+        parser_backend=args.parser,
+        all_floor_plans=args.all_floor_plans,
+    )
+    try:
+        monitor.run(once=args.once)
+    except KeyboardInterrupt:
+        print(f"\nMonitor stopped. Stats: {monitor.stats}")
+
+
+if __name__ == "__main__":
+    main()
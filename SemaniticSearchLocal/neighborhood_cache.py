@@ -0,0 +1,58 @@
+import os
+import threading
+import time
+
+from caching import DEFAULT_CACHE_DIR, SingleFlight, SqliteCache
+
+DEFAULT_NEIGHBORHOOD_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "neighborhoods.sqlite3")
+DEFAULT_MAX_AGE = 30 * 24 * 3600  # Areavibes grades change monthly at most
+
+
+class NeighborhoodCache:
+    """
+    Caches parsed Areavibes neighborhood info keyed by the final neighborhood URL.
+
+    Entries are kept in memory and on disk and reused while younger than
+    `max_age` seconds. Concurrent requests for the same URL share one download.
+    Failed downloads raise and are never cached.
+
+    Attributes:
+        max_age (float): Freshness window in seconds.
+        stats (dict): Number of lookups answered from memory, from disk and by downloading.
+    """
+
+    def __init__(self, path: str = DEFAULT_NEIGHBORHOOD_CACHE_PATH, max_age: float = DEFAULT_MAX_AGE):
+        self.store = SqliteCache(path, table="neighborhoods")
+        self.max_age = max_age
+        self.stats = {"memory": 0, "disk": 0, "download": 0}
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get_info(self, url: str, download_func) -> dict:
+        """
+        Returns the neighborhood info for the URL, calling download_func(url) only
+        when no fresh copy is cached.
+        """
+        with self._memo_lock:
+            entry = self._memo.get(url)
+            if entry and time.time() - entry[1] <= self.max_age:
+                self.stats["memory"] += 1
+                return dict(entry[0])
+
+        info = self._flight.do(url, lambda: self._load(url, download_func))
+        return dict(info)
+
+    def _load(self, url: str, download_func) -> dict:
+        entry = self.store.get(url)
+        if entry is not None and time.time() - entry[1] <= self.max_age:
+            self.stats["disk"] += 1
+            info, stored_at = entry
+        else:
+            self.stats["download"] += 1
+            info = download_func(url)
+            stored_at = time.time()
+            self.store.set(url, info)
+        with self._memo_lock:
+            self._memo[url] = (info, stored_at)
+        return info
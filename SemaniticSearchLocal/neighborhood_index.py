@@ -0,0 +1,92 @@
+import math
+import os
+import sqlite3
+import threading
+
+from caching import DEFAULT_CACHE_DIR
+
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, "neighborhood_index.sqlite3")
+DEFAULT_RADIUS_METERS = 200.0
+CELL_DEGREES = 0.005  # grid cell edge, ~550 m of latitude
+EARTH_RADIUS_METERS = 6371000.0
+
+
+def haversine_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+def _cell(value: float) -> int:
+    return math.floor(value / CELL_DEGREES)
+
+
+class NeighborhoodIndex:
+    """
+    Spatial index of resolved (lat, lon) -> Areavibes neighborhood URL mappings.
+
+    Points are bucketed in a fixed lat/lon grid stored in SQLite. A lookup scans
+    only the cells that can contain a point within `radius_meters` and returns the
+    URL of the nearest recorded point, so addresses close to an already resolved
+    one skip the Areavibes search-results request.
+
+    Attributes:
+        path (str): SQLite database file.
+        radius_meters (float): Maximum distance to a known point for a match.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, radius_meters: float = DEFAULT_RADIUS_METERS):
+        self.path = path
+        self.radius_meters = radius_meters
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS points "
+                "(cell_lat INTEGER, cell_lon INTEGER, lat REAL, lon REAL, url TEXT, "
+                "PRIMARY KEY (lat, lon))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS points_cell ON points (cell_lat, cell_lon)")
+            self._conn.commit()
+        return self._conn
+
+    def add(self, lat: float, lon: float, url: str) -> None:
+        """Records that (lat, lon) resolved to the neighborhood URL."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO points (cell_lat, cell_lon, lat, lon, url) VALUES (?, ?, ?, ?, ?)",
+                (_cell(lat), _cell(lon), lat, lon, url),
+            )
+            conn.commit()
+
+    def lookup(self, lat: float, lon: float):
+        """Returns the URL of the nearest known point within the radius, or None."""
+        radius_lat = self.radius_meters / 111320.0
+        radius_lon = radius_lat / max(math.cos(math.radians(lat)), 0.01)
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT lat, lon, url FROM points "
+                "WHERE cell_lat BETWEEN ? AND ? AND cell_lon BETWEEN ? AND ?",
+                (_cell(lat - radius_lat), _cell(lat + radius_lat),
+                 _cell(lon - radius_lon), _cell(lon + radius_lon)),
+            ).fetchall()
+
+        best_url, best_distance = None, self.radius_meters
+        for point_lat, point_lon, url in rows:
+            distance = haversine_meters(lat, lon, point_lat, point_lon)
+            if distance <= best_distance:
+                best_url, best_distance = url, distance
+        self.stats["hits" if best_url else "misses"] += 1
+        return best_url
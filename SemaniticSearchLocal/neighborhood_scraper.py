@@ -1,10 +1,16 @@
-import time
 import requests
 from bs4 import BeautifulSoup
 import re
 from geopy.geocoders import Nominatim
+from geocode_cache import GeocodeCache
+from http_session import get_session
+from neighborhood_cache import NeighborhoodCache
+from neighborhood_index import NeighborhoodIndex
 
 geolocator = Nominatim(user_agent="geoapi")
+geocode_cache = GeocodeCache(geolocator)
+neighborhood_index = NeighborhoodIndex()
+neighborhood_cache = NeighborhoodCache()
 
 def get_neighborhood_info(address: str) -> dict:
     """
@@ -15,7 +21,30 @@ def get_neighborhood_info(address: str) -> dict:
 
 def get_neighborhood_details(address: str) -> dict:
     url = generate_link(address)
-    info = {
+    return fetch_neighborhood_details(url)
+
+def fetch_neighborhood_details(url: str) -> dict:
+    """
+    Returns the livability metrics of an Areavibes neighborhood page. Pages parsed
+    within the cache's freshness window are served from the neighborhood cache.
+    """
+    if not url:
+        return default_neighborhood_info()
+    try:
+        return neighborhood_cache.get_info(url, download_neighborhood_details)
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred while fetching neighborhood data: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred in get_neighborhood_details: {e}")
+    return default_neighborhood_info()
+
+def download_neighborhood_details(url: str) -> dict:
+    response = get_session().get(url)
+    response.raise_for_status()
+    return parse_neighborhood_details(response.text)
+
+def default_neighborhood_info() -> dict:
+    return {
         "Livability": "N/A",
         "Amenities": "N/A",
         "Commute": "N/A",
@@ -27,49 +56,40 @@ def get_neighborhood_details(address: str) -> dict:
         "Schools": "N/A",
         "Ratings": "N/A"
     }
-    try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/85.0.4183.121 Safari/537.36"
-            )
-        }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        livability_score = soup.find("span", class_="cw-score-numerator")
-        if livability_score:
-            info["Livability"] = f"{livability_score.text.strip()}/100"
-
-        categories = soup.find_all("div", class_="widget-entry ac")
-        for category in categories:
-            category_name = category.find("span")
-            grade_element = category.find("i")
-            if category_name:
-                cat_text = category_name.text.strip()
-                grade_text = grade_element.text.strip() if grade_element else "N/A"
-                info[cat_text] = grade_text
-
-        subcategories = soup.find_all("div", class_="widget-indiv-entry")
-        for subcategory in subcategories:
-            subcategory_name = subcategory.find("b")
-            if subcategory_name:
-                sub_text = subcategory_name.text.strip()
-                sub_number = subcategory_name.next_sibling
-                if sub_number and isinstance(sub_number, str):
-                    sub_number = re.sub(r"\s+", " ", sub_number).strip(" ()")
-                else:
-                    sub_number = "N/A"
-                grade_element = subcategory.find("i")
-                grade_text = grade_element.text.strip() if grade_element else "N/A"
-                info[sub_text] = f"({sub_number}) {grade_text}".replace("\n", "").strip()
 
-    except requests.exceptions.RequestException as e:
-        print(f"An error occurred while fetching neighborhood data: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred in get_neighborhood_details: {e}")
+def parse_neighborhood_details(html_content: str) -> dict:
+    """
+    Parses the livability score, category grades and sub-category grades.
+    """
+    info = default_neighborhood_info()
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    livability_score = soup.find("span", class_="cw-score-numerator")
+    if livability_score:
+        info["Livability"] = f"{livability_score.text.strip()}/100"
+
+    categories = soup.find_all("div", class_="widget-entry ac")
+    for category in categories:
+        category_name = category.find("span")
+        grade_element = category.find("i")
+        if category_name:
+            cat_text = category_name.text.strip()
+            grade_text = grade_element.text.strip() if grade_element else "N/A"
+            info[cat_text] = grade_text
+
+    subcategories = soup.find_all("div", class_="widget-indiv-entry")
+    for subcategory in subcategories:
+        subcategory_name = subcategory.find("b")
+        if subcategory_name:
+            sub_text = subcategory_name.text.strip()
+            sub_number = subcategory_name.next_sibling
+            if sub_number and isinstance(sub_number, str):
+                sub_number = re.sub(r"\s+", " ", sub_number).strip(" ()")
+            else:
+                sub_number = "N/A"
+            grade_element = subcategory.find("i")
+            grade_text = grade_element.text.strip() if grade_element else "N/A"
+            info[sub_text] = f"({sub_number}) {grade_text}".replace("\n", "").strip()
 
     return info
 
@@ -78,9 +98,31 @@ def generate_link(address: str) -> str:
     Generates the final URL for the neighborhood information by geocoding the address
     and then scraping a preliminary page to extract a link.
     """
-    location = geolocator.geocode(address)
+    location = geocode_address(address)
+    return find_neighborhood_url(address, location)
+
+def geocode_address(address: str):
+    """
+    Geocodes the address with Nominatim, going through the on-disk geocode cache
+    so only addresses never seen before reach the geocoder.
+    """
+    location = geocode_cache.geocode(address)
     if not location:
         raise Exception("Location not found for the provided address.")
+    return location
+
+def find_neighborhood_url(address: str, location) -> str:
+    """
+    Scrapes the Areavibes search results for the geocoded address and
+    returns the neighborhood page URL (or None when no match is listed).
+    Locations within the index radius of an already resolved point reuse its
+    URL without the search request.
+    """
+    known_url = neighborhood_index.lookup(location.latitude, location.longitude)
+    if known_url:
+        print(f"Neighborhood URL from spatial index: {known_url}")
+        return known_url
+
     split_address = address.split(",")
     print("Full Location:", location.address)
     addr_url = split_address[0].replace(" ", "+")
@@ -90,19 +132,14 @@ def generate_link(address: str) -> str:
         f"https://www.areavibes.com/search-results/?st={state}&ct={city}zip=&addr={addr_url}"
         f"&ll={location.latitude}+{location.longitude}"
     )
-    time.sleep(3)
-
-    response = None
-    for attempt in range(3):
-        try:
-            response = requests.get(pre_url, timeout=10)
-            if response.status_code == 200:
-                break
-        except requests.RequestException as e:
-            print(f"Web scraping attempt {attempt + 1} failed: {e}")
-            time.sleep(2)
-
-    if not response or response.status_code != 200:
+
+    # Pacing and retries are handled by the session's adaptive rate limiter.
+    try:
+        response = get_session().get(pre_url, timeout=10)
+    except requests.RequestException as e:
+        raise Exception(f"Failed to retrieve the preliminary webpage: {e}")
+
+    if response.status_code != 200:
         raise Exception("Failed to retrieve the preliminary webpage after multiple attempts.")
 
     soup = BeautifulSoup(response.text, "html.parser")
@@ -113,6 +150,7 @@ def generate_link(address: str) -> str:
         print("Found href:", href)
         final_url = f"https://www.areavibes.com{href}"
         print(f"Neighborhood URL: {final_url}")
+        neighborhood_index.add(location.latitude, location.longitude, final_url)
         return final_url
     else:
         print("No element found with class 'pri'.")
@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import os
+import threading
+import zlib
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from caching import DEFAULT_CACHE_DIR, SqliteCache
+from rate_limiter import PacedAdapter
+
+DEFAULT_PAGE_STORE_DIR = os.path.join(DEFAULT_CACHE_DIR, "pages")
+
+
+class PageStore:
+    """
+    Content-addressed store of raw page bodies.
+
+    Bodies are written once per distinct content under objects/<sha256>, zlib
+    compressed. An SQLite index maps every URL to its latest body digest along
+    with the ETag/Last-Modified validators used for conditional GETs. When a
+    URL's body changes, the old object is deleted unless another URL still
+    points at it.
+
+    Attributes:
+        root (str): Directory holding the objects and the index.
+        replay (bool): When True, requests are answered from the store only and
+            never reach the network.
+    """
+
+    def __init__(self, root: str = DEFAULT_PAGE_STORE_DIR, replay: bool = False):
+        self.root = root
+        self.replay = replay
+        self.index = SqliteCache(os.path.join(root, "index.sqlite3"), table="pages")
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def put(self, url: str, body: bytes, headers: dict = None, encoding: str = None) -> str:
+        """Stores the body for the URL and returns its digest."""
+        headers = headers or {}
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        compressed = zlib.compress(body)
+        # Held so a superseded object is not deleted while another URL stores the same body.
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_path, path)
+
+            previous = self.index.get(url)
+            self.index.set(url, {
+                "digest": digest,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "content_type": headers.get("Content-Type"),
+                "encoding": encoding,
+            })
+            if previous is not None and previous[0]["digest"] != digest:
+                self._delete_if_unreferenced(previous[0]["digest"])
+        return digest
+
+    def _delete_if_unreferenced(self, digest: str) -> None:
+        if not self.index.keys_where("digest", digest):
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def prune(self) -> int:
+        """
+        Deletes the objects no URL points at any more (e.g. left behind by older
+        versions of the store) and returns how many were removed.
+        """
+        removed = 0
+        with self._lock:
+            referenced = {entry["digest"] for entry in self.index.values()}
+            objects_dir = os.path.join(self.root, "objects")
+            for prefix in os.listdir(objects_dir) if os.path.isdir(objects_dir) else []:
+                for name in os.listdir(os.path.join(objects_dir, prefix)):
+                    if name.endswith(".tmp") or prefix + name in referenced:
+                        continue
+                    os.remove(os.path.join(objects_dir, prefix, name))
+                    removed += 1
+        return removed
+
+    def get(self, url: str):
+        """Returns (meta, body) for the URL, or None if it was never stored."""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        meta = entry[0]
+        try:
+            with open(self._object_path(meta["digest"]), "rb") as f:
+                return meta, zlib.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def urls(self) -> list:
+        return self.index.keys()
+
+
+def stored_response(request, meta: dict, body: bytes) -> Response:
+    """Builds a 200 response for the request from a stored body."""
+    response = Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = request.url
+    response.request = request
+    response.headers = CaseInsensitiveDict()
+    if meta.get("content_type"):
+        response.headers["Content-Type"] = meta["content_type"]
+    response.encoding = meta.get("encoding")
+    response._content = body
+    response._content_consumed = True
+    response.from_page_store = True
+    return response
+
+
+class StoringAdapter(PacedAdapter):
+    """
+    Paced transport adapter that records GET responses in a PageStore.
+
+    Refetches send If-None-Match / If-Modified-Since with the stored validators,
+    and a 304 is answered with the stored body as a regular 200 response. In
+    replay mode every GET is answered from the store (404 when missing).
+    """
+
+    def __init__(self, page_store: PageStore, **kwargs):
+        super().__init__(**kwargs)
+        self.page_store = page_store
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != "GET":
+            return super().send(request, stream=stream, **kwargs)
+
+        stored = self.page_store.get(request.url)
+        if self.page_store.replay:
+            if stored:
+                return stored_response(request, *stored)
+            response = stored_response(request, {}, b"")
+            response.status_code = 404
+            response.reason = "Not in page store"
+            return response
+
+        if stored:
+            meta = stored[0]
+            if meta.get("etag"):
+                request.headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request.headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = super().send(request, stream=stream, **kwargs)
+        if response.status_code == 304 and stored:
+            response.close()
+            return stored_response(request, *stored)
+        if response.status_code == 200 and not stream:
+            self.page_store.put(request.url, response.content, response.headers, response.encoding)
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or fill the local page store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List the stored URLs.")
+    import_parser = subparsers.add_parser("import", help="Store a saved HTML file under a URL.")
+    import_parser.add_argument("url", help="URL the page was saved from.")
+    import_parser.add_argument("html_file", help="Path to the saved HTML file.")
+    subparsers.add_parser("prune", help="Delete stored bodies no URL points at any more.")
+    args = parser.parse_args()
+
+    store = PageStore()
+    if args.command == "list":
+        for url in store.urls():
+            print(url)
+    elif args.command == "import":
+        with open(args.html_file, "rb") as f:
+            digest = store.put(args.url, f.read(), {"Content-Type": "text/html; charset=utf-8"}, "utf-8")
+        print(f"Stored {args.url} as {digest}")
+    elif args.command == "prune":
+        print(f"Removed {store.prune()} unreferenced objects")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from crawler import Crawler, host_key
+from property_scraper import (
+    attach_neighborhood,
+    fetch_property_html,
+    iter_building_groups,
+    join_url_choice,
+    parse_property_rows,
+)
+
+STAGES = ("fetch", "parse", "enrich", "write")
+
+# Marks the end of a stage's input.
+_DONE = object()
+
+
+class _Item:
+    def __init__(self, url: str, choices: list):
+        self.url = url
+        self.choices = choices
+        self.entries = [join_url_choice(url, choice) for choice in choices]
+        self.html = ""
+        self.rows = []
+
+
+class StagedCrawler(Crawler):
+    """
+    Crawler that runs each step of a building as its own pipeline stage:
+
+        fetch (threads, per-host caps) -> parse (process pool) -> enrich -> write
+
+    Stages are connected by bounded asyncio queues, so a slow stage makes the
+    ones before it wait instead of piling pages up in memory. Parsing runs in
+    separate processes and does not compete with the network threads for the GIL.
+    queue_depths() shows where items are waiting, i.e. the bottleneck.
+
+    Attributes:
+        fetch_workers (int): Buildings fetched at the same time.
+        parse_processes (int): Parser processes (defaults to the number of cores).
+        enrich_workers (int): Buildings enriched with neighborhood data at the same time.
+        queue_size (int): Capacity of each inter-stage queue.
+        report_every (float): If set, queue depths are printed every report_every seconds.
+        processed (dict): Buildings that left each stage in the current crawl.
+    """
+
+    def __init__(self, limits: dict = None, parser_backend: str = "html.parser",
+                 all_floor_plans: bool = False, fetch_workers: int = 16,
+                 parse_processes: int = None, enrich_workers: int = 8, queue_size: int = 32,
+                 report_every: float = None):
+        super().__init__(limits, parser_backend, all_floor_plans)
+        self.fetch_workers = fetch_workers
+        self.parse_processes = parse_processes or os.cpu_count() or 1
+        self.enrich_workers = enrich_workers
+        self.queue_size = queue_size
+        self.report_every = report_every
+        self.processed = dict.fromkeys(STAGES, 0)
+        self._queues = {}
+        self._process_pool = None
+
+    def queue_depths(self) -> dict:
+        """Items waiting in front of each stage."""
+        return {stage: queue.qsize() for stage, queue in self._queues.items()}
+
+    async def _fetch(self, item: _Item) -> _Item:
+        await self._park(urlparse(item.url).hostname)
+        item.html = await self._call(host_key(item.url), fetch_property_html, item.url)
+        return item
+
+    async def _parse(self, item: _Item) -> _Item:
+        if item.html:
+            item.rows = await asyncio.get_running_loop().run_in_executor(
+                self._process_pool, parse_property_rows, item.html, item.choices,
+                self.parser_backend, self.all_floor_plans)
+        item.html = ""
+        return item
+
+    async def _enrich(self, item: _Item) -> _Item:
+        if item.rows:
+            attach_neighborhood(item.rows, await self.get_neighborhood_info(item.rows[0].address))
+        return item
+
+    async def _stage(self, name: str, func, workers: int, outbox: asyncio.Queue, next_workers: int) -> None:
+        inbox = self._queues[name]
+
+        async def worker():
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+                try:
+                    item = await func(item)
+                except Exception as e:
+                    print(f"Error in {name} stage for {item.url}: {e}")
+                    item.html, item.rows = "", []
+                self.processed[name] += 1
+                await outbox.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        for _ in range(next_workers):
+            await outbox.put(_DONE)
+
+    async def _feed(self, urls) -> None:
+        try:
+            for url, choices in iter_building_groups(urls):
+                await self._queues["fetch"].put(_Item(url, choices))
+        finally:
+            # Let the stages drain even if reading the input failed; crawl_buildings re-raises.
+            for _ in range(self.fetch_workers):
+                await self._queues["fetch"].put(_DONE)
+
+    async def _report(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            print(f"Queue depths: {self.queue_depths()} processed: {self.processed}")
+
+    async def crawl_buildings(self, urls, concurrency: int = None):
+        """
+        Runs the pipeline over the url.txt entries and yields (url, entries, rows)
+        per building as it reaches the write stage, like Crawler.crawl_buildings.
+        `concurrency` overrides fetch_workers. Failed buildings yield no rows.
+        """
+        if concurrency:
+            self.fetch_workers = concurrency
+        self._queues = {stage: asyncio.Queue(self.queue_size) for stage in STAGES}
+        self.processed = dict.fromkeys(STAGES, 0)
+        self._executor = ThreadPoolExecutor(max_workers=max(self.fetch_workers, sum(self.limits.values())))
+        self._process_pool = ProcessPoolExecutor(max_workers=self.parse_processes)
+        feed_task = asyncio.create_task(self._feed(urls))
+        tasks = [
+            feed_task,
+            asyncio.create_task(self._stage("fetch", self._fetch, self.fetch_workers,
+                                            self._queues["parse"], self.parse_processes)),
+            asyncio.create_task(self._stage("parse", self._parse, self.parse_processes,
+                                            self._queues["enrich"], self.enrich_workers)),
+            asyncio.create_task(self._stage("enrich", self._enrich, self.enrich_workers,
+                                            self._queues["write"], 1)),
+        ]
+        if self.report_every:
+            tasks.append(asyncio.create_task(self._report(self.report_every)))
+        started = time.monotonic()
+        try:
+            while True:
+                item = await self._queues["write"].get()
+                if item is _DONE:
+                    break
+                self.processed["write"] += 1
+                yield item.url, item.entries, item.rows
+            await feed_task  # re-raises an error from reading the input
+            print(f"Pipeline finished {self.processed['write']} buildings in {time.monotonic() - started:.1f}s.")
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._process_pool = None
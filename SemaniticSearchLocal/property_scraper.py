@@ -1,9 +1,19 @@
-import time
 import requests
-from bs4 import BeautifulSoup
-import re
-
-def get_property_info(url_full: str, get_neighborhood_info_func) -> dict:
+from http_session import get_session
+from extraction import (
+    FLOOR_PLAN_EXTRACTORS,
+    ExtractionEngine,
+    extract_address,
+    extract_amenities,
+    extract_name,
+    extract_room_info,
+    parse_document,
+    unit_rows,
+)
+from listing import Listing, NeighborhoodMetrics
+
+def get_property_info(url_full: str, get_neighborhood_info_func,
+                      parser_backend: str = "html.parser", timings: dict = None) -> dict:
     """
     Scrapes rental property details from a given URL.
     The URL string can contain an extra part (separated by a space)
@@ -11,185 +21,154 @@ def get_property_info(url_full: str, get_neighborhood_info_func) -> dict:
     
     The get_neighborhood_info_func parameter is a callable that accepts
     an address string and returns a dictionary of neighborhood metrics.
+
+    The page is parsed once with parser_backend ("html.parser", "lxml" or
+    "selectolax"). If a timings dict is passed, it is filled with the
+    per-extractor timing breakdown in seconds.
     """
-    info = {}
-    url = url_full.split()[0]
-    try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/85.0.4183.121 Safari/537.36"
-            )
-        }
-        # Try up to 3 times in case of rate limiting
-        for attempt in range(3):
-            response = requests.get(url, headers=headers)
-            if response.status_code == 429:
-                print(f"Rate limit hit. Retrying in {2**attempt} seconds...")
-                time.sleep(2**attempt)
-            else:
-                response.raise_for_status()
-                html_content = response.text
-
-                split_url = url_full.split()
-                choice = " ".join(split_url[1:]) if len(split_url) > 1 else None
-                if choice:
-                    print("Room choice specified:", choice)
-                else:
-                    print("No room choice provided.")
-
-                # RENTAL DETAILS
-                info["Building Name"] = get_name(html_content)
-                info["Address"] = get_address(html_content)
-                room_info = get_room_info_bs(html_content, choice)
-                info["Room Title"] = room_info["Room Title"]
-                info["Bed/Baths"] = room_info["Bed/Baths"]
-                info["Price"] = room_info["Price"]
-                info["Sqft"] = room_info["Sqft"]
-                info["Availability"] = room_info["Availability"]
-
-                amenities = get_amenities(html_content)
-                info.update(amenities)
-
-                # NEIGHBORHOOD DETAILS using the provided function
-                neighborhood = get_neighborhood_info_func(info["Address"])
-                info.update(neighborhood)
-
-                print("Final combined info:")
-                print(info)
-                return info
-        print("Max retries reached.")
+    url, choice = split_url_choice(url_full)
+    html_content = fetch_property_html(url)
+    if not html_content:
         return {}
+
+    info = parse_property_html(html_content, choice, parser_backend, timings)
+
+    # NEIGHBORHOOD DETAILS using the provided function
+    neighborhood = get_neighborhood_info_func(info["Address"])
+    info.update(neighborhood)
+
+    print("Final combined info:")
+    print(info)
+    return info
+
+def get_property_rows(url: str, choices: list, get_neighborhood_info_func,
+                      parser_backend: str = "html.parser", all_floor_plans: bool = False) -> list:
+    """
+    Scrapes one building for several url.txt entries that share its URL.
+    The page is fetched, parsed and neighborhood-enriched once, and one Listing
+    is returned per requested room choice (in the order of `choices`), or
+    per floor plan on the page when all_floor_plans is set.
+    Returns an empty list if the page could not be fetched.
+    """
+    html_content = fetch_property_html(url)
+    if not html_content:
+        return []
+
+    rows = parse_property_rows(html_content, choices, parser_backend, all_floor_plans)
+    attach_neighborhood(rows, get_neighborhood_info_func(rows[0].address))
+    return rows
+
+def attach_neighborhood(rows: list, neighborhood_info: dict) -> None:
+    """Gives every Listing of a building the same NeighborhoodMetrics object."""
+    metrics = NeighborhoodMetrics.from_info(neighborhood_info)
+    for row in rows:
+        row.neighborhood = metrics
+
+def group_by_building(urls) -> list:
+    """
+    Groups url.txt entries by property URL, keeping first-seen order.
+    Returns a list of (url, choices) pairs; repeated entries are listed once.
+    """
+    return list(iter_building_groups(urls, window=None))
+
+def iter_building_groups(urls, window: int = 1024):
+    """
+    Lazy group_by_building for long url.txt files. At most `window` buildings
+    are held open; when another one arrives, the oldest group is yielded. An
+    entry for a building that was already yielded starts a new group, so
+    entries of one building should be close together in the file.
+    With window=None every group is held until the input ends.
+    """
+    groups = {}
+    for url_full in urls:
+        url, choice = split_url_choice(url_full)
+        if url not in groups and window is not None and len(groups) >= window:
+            oldest = next(iter(groups))
+            yield oldest, groups.pop(oldest)
+        choices = groups.setdefault(url, [])
+        if choice not in choices:
+            choices.append(choice)
+    yield from groups.items()
+
+def join_url_choice(url: str, choice: str) -> str:
+    """Inverse of split_url_choice."""
+    return f"{url} {choice}" if choice else url
+
+def split_url_choice(url_full: str) -> tuple:
+    """
+    Splits a url.txt entry into the property URL and the optional room choice.
+    """
+    split_url = url_full.split()
+    choice = " ".join(split_url[1:]) if len(split_url) > 1 else None
+    return split_url[0], choice
+
+def fetch_property_html(url: str) -> str:
+    """
+    Downloads the property page. Pacing and retries on 429/5xx are handled by
+    the session's adaptive per-host rate limiter.
+    Returns an empty string if the page could not be fetched.
+    """
+    try:
+        response = get_session().get(url)
+        response.raise_for_status()
+        return response.text
     except requests.exceptions.RequestException as e:
         print(f"An error occurred in get_property_info: {e}")
-        return {}
+        return ""
+
+def parse_property_html(html_content: str, choice: str,
+                        parser_backend: str = "html.parser", timings: dict = None) -> dict:
+    """
+    Extracts the rental details (name, address, room, amenities) from a fetched page.
+    """
+    if choice:
+        print("Room choice specified:", choice)
+    else:
+        print("No room choice provided.")
+
+    # RENTAL DETAILS (single parse, every extractor on the same tree)
+    result = ExtractionEngine(parser_backend).extract(html_content, choice)
+    if timings is not None:
+        timings.update(result.timings)
+    return result.fields
+
+def parse_property_rows(html_content: str, choices: list, parser_backend: str = "html.parser",
+                        all_floor_plans: bool = False) -> list:
+    """
+    Parses a fetched page once and returns one Listing per room choice. The
+    building-level fields are extracted a single time and shared by every row.
+    With all_floor_plans the choices are ignored and every unit on the page
+    gets its own row. The listings have no neighborhood yet (see attach_neighborhood).
+    """
+    if all_floor_plans:
+        fields = ExtractionEngine(parser_backend, FLOOR_PLAN_EXTRACTORS).extract(html_content).fields
+        return [Listing.from_fields(row) for row in unit_rows(fields)]
+
+    engine = ExtractionEngine(parser_backend)
+    doc = engine.parse(html_content)
+    shared = engine.run(doc, None)
+    rows = []
+    for choice in choices:
+        row = dict(shared)
+        row.update(extract_room_info(doc, choice))
+        rows.append(Listing.from_fields(row))
+    return rows
 
 def get_room_info_bs(html_content: str, choice: str) -> dict:
     """
-    Extracts room information from the HTML content using BeautifulSoup.
+    Extracts room information from the HTML content.
     If a specific room choice is provided, it returns data only for that room.
     """
-    info = {
-        "Room Title": "None",
-        "Bed/Baths": "None",
-        "Price": "None",
-        "Sqft": "None",
-        "Availability": "None"
-    }
-
-    if not choice:
-        return info
-
-    soup = BeautifulSoup(html_content, "html.parser")
-    elements = soup.find_all("div", class_="floorPlanInfo")
-
-    if not elements:
-        print("No floorPlanInfo elements found.")
-        return info
-
-    for element in elements:
-        name_elem = element.find("div", class_="name")
-        details = element.find("div", class_="details")
-        price = element.find("div", class_="price")
-        available_count = element.find("div", class_="availableCount")
-
-        if name_elem:
-            room_name = name_elem.text.strip()
-            print(f"Found Room Title: {room_name}")
-            if room_name != choice:
-                continue
-
-        info["Room Title"] = room_name if name_elem else "None"
-        info["Bed/Baths"] = (
-            details.text.split("·")[0].strip()
-            if details and "·" in details.text else "None"
-        )
-        info["Sqft"] = (
-            details.text.split("·")[2].strip().replace("Sqft.", "").strip()
-            if details and "·" in details.text else "None"
-        )
-        info["Price"] = price.text.strip() if price else "None"
-        info["Availability"] = (
-            available_count.text.strip() if available_count else "None"
-        )
-        break
-
-    return info
+    return extract_room_info(parse_document(html_content), choice)
 
 def get_name(html_content: str) -> str:
-    soup = BeautifulSoup(html_content, "html.parser")
-    element = soup.find("h1", class_="property-header")
-    return element.text.strip() if element else "Name not found"
+    return extract_name(parse_document(html_content))["Building Name"]
 
 def get_address(html_content: str) -> str:
-    soup = BeautifulSoup(html_content, "html.parser")
-    element = soup.find("h2", class_="full-address")
-    return element.text.strip() if element else "Address not found"
+    return extract_address(parse_document(html_content))["Address"]
 
 def get_amenities(html_content: str) -> dict:
     """
     Extracts amenities (pets, parking, lease terms, etc.) from the HTML.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    print("Retrieving amenities...")
-
-    amenities = {
-        "Cats Allowed": False,
-        "Dogs Allowed": False,
-        "Cat Rent": None,
-        "Dog Rent": None,
-        "Parking Type": None,
-        "Parking Fee": None,
-        "Assigned Parking": None,
-        "EV Parking Fee": None,
-        "Lease Term": None,
-        "Application fee": None
-    }
-
-    pets_blocks = soup.find_all("div", class_="PetsBlock")
-    for pet_block in pets_blocks:
-        pet_type = pet_block.find("h3")
-        pet_rent = pet_block.find("div", class_="table-value")
-        if pet_type and "Cats welcome" in pet_type.text:
-            amenities["Cats Allowed"] = True
-            amenities["Cat Rent"] = pet_rent.text if pet_rent else None
-        if pet_type and "Dogs welcome" in pet_type.text:
-            amenities["Dogs Allowed"] = True
-            amenities["Dog Rent"] = pet_rent.text if pet_rent else None
-
-    parking_block = soup.find("div", class_="ParkingTypeBlock")
-    if parking_block:
-        parking_rows = parking_block.find_all("div", class_="table-row")
-        for row in parking_rows:
-            label = row.find("span", class_="table-label")
-            value = row.find("div", class_="table-value")
-            if label and value:
-                if "Type" in label.text:
-                    amenities["Parking Type"] = value.text
-                elif "Parking fee" in label.text:
-                    amenities["Parking Fee"] = value.text
-                elif "Assigned" in label.text:
-                    amenities["Assigned Parking"] = value.text
-
-        ev_parking_fee = parking_block.find("p", class_="comment")
-        if ev_parking_fee and "EV Spots Available" in ev_parking_fee.text:
-            amenities["EV Parking Fee"] = ev_parking_fee.text.split("for ")[-1]
-
-    lease_term = soup.find("div", class_="LeaseTermBlock")
-    if lease_term:
-        lease_rows = lease_term.find_all("div", class_="table-row")
-        for row in lease_rows:
-            label = row.find("span", class_="table-label")
-            value = row.find("div", class_="table-value")
-            if label and value:
-                key = label.text.strip()
-                val = value.text.strip()
-                if key == "Term type":
-                    amenities["Lease Term"] = val
-                elif key == "Application fee":
-                    amenities["Application fee"] = val
-
-    print("Amenities retrieved:")
-    print(amenities)
-    return amenities
+    return extract_amenities(parse_document(html_content))
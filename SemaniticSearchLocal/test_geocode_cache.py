@@ -0,0 +1,47 @@
+import pytest
+
+from geocode_cache import GeocodeCache, GeocodeReplayError
+
+
+class StubLocation:
+    latitude = 47.62
+    longitude = -122.36
+    address = "200 2nd Ave W, Seattle, WA 98119"
+
+
+class StubGeolocator:
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, address):
+        self.calls += 1
+        return StubLocation()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(GeocodeCache, "replay", GeocodeCache.replay)
+    cache = GeocodeCache(StubGeolocator(), path=str(tmp_path / "geocode.sqlite3"))
+    cache.limiter.acquire = lambda: None
+    return cache
+
+
+def test_cache_miss_calls_the_geocoder(cache):
+    location = cache.geocode("200 2nd Avenue West, Seattle, WA 98119")
+    assert (location.latitude, location.longitude) == (47.62, -122.36)
+    assert cache.geolocator.calls == 1
+
+
+def test_cache_miss_in_replay_mode_fails_without_the_geocoder(cache):
+    GeocodeCache.replay = True
+    with pytest.raises(GeocodeReplayError):
+        cache.geocode("200 2nd Avenue West, Seattle, WA 98119")
+    assert cache.geolocator.calls == 0
+
+
+def test_replay_mode_answers_from_the_cache(cache):
+    cache.geocode("200 2nd Avenue West, Seattle, WA 98119")
+    cache._memo.clear()
+    GeocodeCache.replay = True
+    assert cache.geocode("200 2nd Ave W, Seattle, WA 98119").latitude == 47.62
+    assert cache.geolocator.calls == 1
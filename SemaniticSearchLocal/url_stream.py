@@ -0,0 +1,120 @@
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+
+from caching import DEFAULT_CACHE_DIR
+from property_scraper import join_url_choice, split_url_choice
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Never reports an added key as missing; reports a missing key as present
+    with probability about `error_rate` while at most `capacity` keys were added.
+
+    Attributes:
+        size (int): Number of bits.
+        hashes (int): Bit positions set per key.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenSet:
+    """
+    Exact set of strings whose memory use does not grow with its size.
+
+    Keys live in an SQLite table; a Bloom filter in front of it answers most
+    lookups for new keys without touching the disk, and inserts are written in
+    batches. Without a path the table is a temporary file removed by close().
+
+    Attributes:
+        path (str): SQLite database file.
+        batch_size (int): Keys buffered in memory before they are written.
+    """
+
+    def __init__(self, path: str = None, capacity: int = 5_000_000, error_rate: float = 0.01,
+                 batch_size: int = 10_000):
+        self._temporary = path is None
+        if path is None:
+            os.makedirs(DEFAULT_CACHE_DIR, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix="seen-", suffix=".sqlite3", dir=DEFAULT_CACHE_DIR)
+            os.close(fd)
+        self.path = path
+        self.batch_size = batch_size
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._pending = set()
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        for (key,) in self._conn.execute("SELECT key FROM seen"):
+            self._bloom.add(key)
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._conn.executemany("INSERT OR IGNORE INTO seen (key) VALUES (?)",
+                                   ((key,) for key in self._pending))
+            self._conn.commit()
+            self._pending.clear()
+
+    def __contains__(self, key: str) -> bool:
+        if key not in self._bloom:
+            return False
+        if key in self._pending:
+            return True
+        return self._conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def add(self, key: str) -> bool:
+        """Adds the key; returns False if it was already present."""
+        if key in self:
+            return False
+        self._bloom.add(key)
+        self._pending.add(key)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        return True
+
+    def close(self) -> None:
+        self._flush()
+        self._conn.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+
+def iter_url_file(path: str):
+    """Yields the non-empty lines of a url.txt file one at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def unique_entries(entries, seen: SeenSet):
+    """Yields each url.txt entry once, normalized to "<url> <choice>"."""
+    for entry in entries:
+        entry = join_url_choice(*split_url_choice(entry))
+        if seen.add(entry):
+            yield entry
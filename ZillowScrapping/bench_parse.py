@@ -0,0 +1,45 @@
+"""
+Times parse_body against the full BeautifulSoup parse (parse_body_soup) on saved
+zillow pages and checks that both return the same data, also with a decoy
+<script data-id="__NEXT_DATA__"> placed in front of the real one.
+
+    cd ZillowScrapping && python bench_parse.py page.html [page2.html ...]
+"""
+import argparse
+import time
+
+from pyzill.parse import parse_body, parse_body_soup
+
+# Not the #__NEXT_DATA__ element; both parsers must skip it.
+DECOY = b'<script data-id="__NEXT_DATA__" type="application/json">{}</script>'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parse_body against parse_body_soup on saved zillow pages.")
+    parser.add_argument("html_files", nargs="+", help="Saved zillow pages.")
+    parser.add_argument("--repeat", "-n", type=int, default=20, help="Runs per parser; the fastest is reported.")
+    args = parser.parse_args()
+
+    for html_file in args.html_files:
+        with open(html_file, "rb") as f:
+            body = f.read()
+        print(f"\n{html_file} ({len(body) / 1024:.0f} KiB)")
+        results = {}
+        timings = {}
+        for parse in (parse_body, parse_body_soup):
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                results[parse.__name__] = parse(body)
+                best = min(best, time.perf_counter() - started)
+            timings[parse.__name__] = best
+            print(f"  {parse.__name__:<16} {best * 1000:8.2f} ms")
+        print(f"  speedup          {timings['parse_body_soup'] / timings['parse_body']:8.1f}x")
+        if results["parse_body"] != results["parse_body_soup"]:
+            print("  WARNING: parse_body and parse_body_soup returned different data")
+        if parse_body(DECOY + body) != results["parse_body_soup"]:
+            print("  WARNING: parse_body was misled by a data-id=\"__NEXT_DATA__\" script")
+
+
+if __name__ == "__main__":
+    main()
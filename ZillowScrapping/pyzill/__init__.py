@@ -1,3 +1,6 @@
-from pyzill.details import get_from_home_id, get_from_deparment_id, get_from_deparment_url, get_from_home_url
+from pyzill.details import get_from_home_id, get_from_deparment_id, get_from_deparment_url, get_from_home_url, async_get_from_home_id, async_get_from_home_url
+from pyzill.client import ZillowClient,get_client
 from pyzill.search import for_sale,for_rent,sold
+from pyzill.area import AreaCrawler,search_area
+from pyzill.proxy_pool import ProxyPool
 from pyzill.utils import parse_proxy
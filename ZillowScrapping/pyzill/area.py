@@ -0,0 +1,257 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from math import log2
+from typing import Any, Iterator, Tuple
+
+from pyzill.client import ZillowClient
+from pyzill.proxy_pool import ProxyPool
+from pyzill.search import for_rent, for_sale, sold
+
+# mapResults never holds more than this many listings; a tile that returns this
+# many may be missing some and is split into quadrants.
+MAP_RESULTS_CAP = 500
+
+SEARCH_FUNCTIONS = {
+    "for_sale": for_sale,
+    "for_rent": for_rent,
+    "sold": sold,
+}
+
+Tile = Tuple[float, float, float, float, int]
+
+
+def zoom_for_tile(ne_long: float, sw_long: float) -> int:
+    """map zoom at which a tile fills a ~1000px wide map
+
+    Args:
+        ne_long (float): ne longitude value
+        sw_long (float): sw longitude value
+
+    Returns:
+        int: zoom value between 1 and 20
+    """
+    span = max(ne_long - sw_long, 1e-9)
+    return max(1, min(20, int(log2(360 * 1000 / (256 * span)))))
+
+
+def split_tile(tile: Tile) -> list[Tile]:
+    """split a tile into its four quadrants
+
+    Args:
+        tile (Tile): (ne_lat, ne_long, sw_lat, sw_long, depth)
+
+    Returns:
+        list[Tile]: quadrants one level deeper
+    """
+    ne_lat, ne_long, sw_lat, sw_long, depth = tile
+    mid_lat = (ne_lat + sw_lat) / 2
+    mid_long = (ne_long + sw_long) / 2
+    return [
+        (ne_lat, ne_long, mid_lat, mid_long, depth + 1),
+        (ne_lat, mid_long, mid_lat, sw_long, depth + 1),
+        (mid_lat, ne_long, sw_lat, mid_long, depth + 1),
+        (mid_lat, mid_long, sw_lat, sw_long, depth + 1),
+    ]
+
+
+def listing_key(listing: dict[str, Any]) -> str | None:
+    """identity of a map result: its zpid, or the building/lot id for buildings
+
+    Args:
+        listing (dict[str, Any]): one entry of mapResults
+
+    Returns:
+        str | None: key used to drop the same listing returned by several tiles
+    """
+    for field in ("zpid", "buildingId", "lotId", "detailUrl"):
+        value = listing.get(field)
+        if value:
+            return f"{field}:{value}"
+    return None
+
+
+class RateLimiter:
+    """spaces request starts at least 1/requests_per_second apart, across threads"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class AreaCrawler:
+    """crawl every listing in a bounding box despite the 500 mapResults cap
+
+    The box is searched as one tile; a tile that comes back saturated (500 map
+    results) is split into four quadrants that are searched in turn, down to
+    max_depth. Tiles are fetched concurrently by max_workers threads, no faster
+    than requests_per_second overall, and listings are yielded as soon as their
+    tile finishes, once per zpid.
+
+    Attributes:
+        listing_type (str): "for_sale", "for_rent" or "sold"
+        filters (dict[str, Any]): search_value, beds, bathrooms and price bounds
+            passed to the search function
+        proxy_url (str | ProxyPool | None): proxy URL, or pool of proxies, for masking the requests
+        client (ZillowClient | None): client to send the requests with; defaults to
+            the shared client of proxy_url
+        max_workers (int): tiles fetched at the same time
+        max_depth (int): number of times a tile may be split
+        retries (int): extra attempts for a tile whose request failed
+        stats (dict[str, int]): tiles searched, tiles split, saturated tiles
+            that could not be split further, failed tiles, listings and duplicates
+        failed_tiles (list[Tile]): tiles given up on after the retries
+    """
+
+    def __init__(
+        self,
+        listing_type: str = "for_sale",
+        search_value: str | None = None,
+        min_beds: int | None = None,
+        max_beds: int | None = None,
+        min_bathrooms: int | None = None,
+        max_bathrooms: int | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        proxy_url: str | ProxyPool | None = None,
+        client: ZillowClient | None = None,
+        max_workers: int = 4,
+        requests_per_second: float = 1.0,
+        max_depth: int = 8,
+        retries: int = 2,
+    ):
+        if listing_type not in SEARCH_FUNCTIONS:
+            raise ValueError(f"listing_type must be one of {', '.join(SEARCH_FUNCTIONS)}")
+        self.listing_type = listing_type
+        self.filters = {
+            "search_value": search_value,
+            "min_beds": min_beds,
+            "max_beds": max_beds,
+            "min_bathrooms": min_bathrooms,
+            "max_bathrooms": max_bathrooms,
+            "min_price": min_price,
+            "max_price": max_price,
+        }
+        self.proxy_url = proxy_url
+        self.client = client
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.retries = retries
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.stats = {}
+        self.failed_tiles = []
+
+    def search_tile(self, tile: Tile) -> list[dict[str, Any]]:
+        """search one tile, retrying failed requests
+
+        Args:
+            tile (Tile): (ne_lat, ne_long, sw_lat, sw_long, depth)
+
+        Returns:
+            list[dict[str, Any]]: mapResults of the tile
+        """
+        ne_lat, ne_long, sw_lat, sw_long, _ = tile
+        search_function = SEARCH_FUNCTIONS[self.listing_type]
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.wait()
+            try:
+                results = search_function(
+                    1, self.filters["search_value"],
+                    self.filters["min_beds"], self.filters["max_beds"],
+                    self.filters["min_bathrooms"], self.filters["max_bathrooms"],
+                    self.filters["min_price"], self.filters["max_price"],
+                    ne_lat, ne_long, sw_lat, sw_long,
+                    zoom_for_tile(ne_long, sw_long), self.proxy_url, self.client,
+                )
+                return results.get("mapResults", [])
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def crawl(self, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float) -> Iterator[dict[str, Any]]:
+        """yield every listing in the bounding box, each one once
+
+        Args:
+            ne_lat (float): ne latitude value
+            ne_long (float): ne longitude value
+            sw_lat (float): sw latitude value
+            sw_long (float): sw longitude value
+
+        Yields:
+            dict[str, Any]: map results, in the order their tiles finish
+        """
+        self.stats = dict.fromkeys(("tiles", "split", "saturated", "failed", "listings", "duplicates"), 0)
+        self.failed_tiles = []
+        seen = set()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+        try:
+            root = (ne_lat, ne_long, sw_lat, sw_long, 0)
+            pending[executor.submit(self.search_tile, root)] = root
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tile = pending.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception:
+                        self.stats["failed"] += 1
+                        self.failed_tiles.append(tile)
+                        continue
+                    self.stats["tiles"] += 1
+                    if len(results) >= MAP_RESULTS_CAP:
+                        if tile[4] < self.max_depth:
+                            self.stats["split"] += 1
+                            for quadrant in split_tile(tile):
+                                pending[executor.submit(self.search_tile, quadrant)] = quadrant
+                        else:
+                            self.stats["saturated"] += 1
+                    # Listings of a split tile are yielded right away; its quadrants
+                    # return them again and the duplicates are dropped.
+                    for listing in results:
+                        key = listing_key(listing)
+                        if key is not None and key in seen:
+                            self.stats["duplicates"] += 1
+                            continue
+                        if key is not None:
+                            seen.add(key)
+                        self.stats["listings"] += 1
+                        yield listing
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+
+def search_area(
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    listing_type: str = "for_sale",
+    **kwargs: Any,
+) -> Iterator[dict[str, Any]]:
+    """get every listing of a bounding box, splitting it into tiles to get past the
+    500 results limit of a single search (see AreaCrawler for the options)
+
+    Args:
+        ne_lat (float): ne latitude value
+        ne_long (float): ne longitude value
+        sw_lat (float): sw latitude value
+        sw_long (float): sw longitude value
+        listing_type (str, optional): "for_sale", "for_rent" or "sold". Defaults to "for_sale".
+
+    Returns:
+        Iterator[dict[str, Any]]: map results, each listing once
+    """
+    return AreaCrawler(listing_type, **kwargs).crawl(ne_lat, ne_long, sw_lat, sw_long)
@@ -0,0 +1,248 @@
+import asyncio
+import threading
+import time
+from typing import Any
+
+from curl_cffi import requests
+
+from pyzill.proxy_pool import ProxyPool, is_blocked
+
+IMPERSONATE = "chrome124"
+
+headers = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Accept-Language": "en",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Sec-Ch-Ua": '"Chromium";v="130", "Google Chrome";v="130", "Not?A_Brand";v="99"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/130.0.0.0 Safari/537.36",
+}
+
+
+class ZillowClient:
+    """long-lived browser-impersonating HTTP client for zillow
+
+    The underlying curl_cffi session is created once, so TLS handshakes and
+    fingerprint setup are paid per connection instead of per request, and
+    cookies set by zillow are sent back on later requests. The sync session
+    keeps one curl handle (and its open connections) per thread, so a client
+    can be shared by worker threads. The async methods use one AsyncSession per
+    running event loop, which multiplexes concurrent requests over HTTP/2; it
+    is closed by aclose() or, at the latest, when asyncio.run() shuts its loop
+    down. All sessions share the same cookie jar.
+
+    With a ProxyPool in place of proxy_url, every request goes through the
+    healthiest proxy of the pool; connection errors, 5xx responses and block
+    pages are reported to the pool and the request is tried again on another
+    proxy, up to proxy_attempts times.
+
+    Attributes:
+        proxy_url (str | ProxyPool | None): proxy URL, or pool of proxies, for masking the requests
+        proxy_attempts (int): proxies tried per request when proxy_url is a pool
+        impersonate (str): browser fingerprint presented by curl_cffi
+        timeout (float): request timeout in seconds
+        max_clients (int): concurrent requests of the async session
+        session (requests.Session): session used by the sync methods
+    """
+
+    def __init__(
+        self,
+        proxy_url: str | ProxyPool | None = None,
+        impersonate: str = IMPERSONATE,
+        timeout: float = 30,
+        max_clients: int = 10,
+        proxy_attempts: int = 3,
+    ):
+        self.proxy_url = proxy_url
+        self.proxy_attempts = proxy_attempts
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.max_clients = max_clients
+        self.session = requests.Session(
+            headers=headers,
+            proxies=self._proxies(),
+            impersonate=impersonate,
+            timeout=timeout,
+        )
+        # event loop -> (AsyncSession, task closing it when the loop shuts down)
+        self._async_sessions = {}
+        self._async_lock = threading.Lock()
+
+    def _proxies(self) -> dict[str, str] | None:
+        if isinstance(self.proxy_url, ProxyPool) or not self.proxy_url:
+            return None
+        return {"http": self.proxy_url, "https": self.proxy_url}
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        pool = self.proxy_url
+        if not isinstance(pool, ProxyPool):
+            return self.session.request(method, url, **kwargs)
+        tried = set()
+        for attempt in range(1, self.proxy_attempts + 1):
+            proxy = pool.acquire(tried)
+            tried.add(proxy)
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, proxies={"http": proxy, "https": proxy}, **kwargs)
+            except requests.RequestsError:
+                pool.release(proxy, failed=True)
+                if attempt == self.proxy_attempts:
+                    raise
+                continue
+            except BaseException:
+                pool.abandon(proxy)
+                raise
+            if not self._report(pool, proxy, response, time.monotonic() - started):
+                return response
+        return response
+
+    async def _async_request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        pool = self.proxy_url
+        session = self._get_async_session()
+        if not isinstance(pool, ProxyPool):
+            return await session.request(method, url, **kwargs)
+        tried = set()
+        for attempt in range(1, self.proxy_attempts + 1):
+            proxy = await pool.async_acquire(tried)
+            tried.add(proxy)
+            started = time.monotonic()
+            try:
+                response = await session.request(method, url, proxies={"http": proxy, "https": proxy}, **kwargs)
+            except requests.RequestsError:
+                pool.release(proxy, failed=True)
+                if attempt == self.proxy_attempts:
+                    raise
+                continue
+            except BaseException:
+                pool.abandon(proxy)
+                raise
+            if not self._report(pool, proxy, response, time.monotonic() - started):
+                return response
+        return response
+
+    @staticmethod
+    def _report(pool: ProxyPool, proxy: str, response: requests.Response, latency: float) -> bool:
+        """records the response in the pool; True if it should be retried on another proxy"""
+        blocked = is_blocked(response.status_code, response.content)
+        failed = response.status_code >= 500
+        pool.release(proxy, latency, failed=failed, blocked=blocked)
+        return blocked or failed
+
+    def get(self, url: str, raise_for_status: bool = False) -> requests.Response:
+        """GET a page with the browser headers
+
+        Args:
+            url (str): page URL
+            raise_for_status (bool, optional): raise on 4xx/5xx responses. Defaults to False.
+
+        Returns:
+            requests.Response: response of the request
+        """
+        response = self._request("GET", url)
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+    def put(self, url: str, json: Any, request_headers: dict[str, str] | None = None) -> requests.Response:
+        """PUT a JSON body
+
+        Args:
+            url (str): endpoint URL
+            json (Any): body of the request
+            request_headers (dict[str, str] | None, optional): headers set over the
+                browser headers for this request. Defaults to None.
+
+        Returns:
+            requests.Response: response of the request
+        """
+        return self._request("PUT", url, json=json, headers=request_headers)
+
+    def _get_async_session(self) -> requests.AsyncSession:
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            entry = self._async_sessions.get(loop)
+            if entry is None:
+                # loops closed without asyncio.run() never ran their closer; forget them
+                for closed_loop in [other for other in self._async_sessions if other.is_closed()]:
+                    del self._async_sessions[closed_loop]
+                session = requests.AsyncSession(
+                    headers=headers,
+                    cookies=self.session.cookies.jar,
+                    proxies=self._proxies(),
+                    impersonate=self.impersonate,
+                    timeout=self.timeout,
+                    max_clients=self.max_clients,
+                )
+                entry = self._async_sessions[loop] = (session, loop.create_task(self._close_with_loop(loop, session)))
+        return entry[0]
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, session: requests.AsyncSession) -> None:
+        """wait until cancelled (by aclose, or by asyncio.run at shutdown), then close the loop's session"""
+        try:
+            await loop.create_future()
+        finally:
+            with self._async_lock:
+                if self._async_sessions.get(loop, (None,))[0] is session:
+                    del self._async_sessions[loop]
+            await session.close()
+
+    async def async_get(self, url: str, raise_for_status: bool = False) -> requests.Response:
+        """async version of get"""
+        response = await self._async_request("GET", url)
+        if raise_for_status:
+            response.raise_for_status()
+        return response
+
+    async def async_put(self, url: str, json: Any, request_headers: dict[str, str] | None = None) -> requests.Response:
+        """async version of put"""
+        return await self._async_request("PUT", url, json=json, headers=request_headers)
+
+    async def aclose(self) -> None:
+        """close the async session of the running loop"""
+        with self._async_lock:
+            entry = self._async_sessions.get(asyncio.get_running_loop())
+        if entry is not None:
+            closer = entry[1]
+            closer.cancel()
+            try:
+                await closer
+            except asyncio.CancelledError:
+                pass
+
+    def close(self) -> None:
+        """close the sync session and its connections"""
+        self.session.close()
+
+    def __enter__(self) -> "ZillowClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_clients: dict[str | ProxyPool | None, ZillowClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(proxy_url: str | ProxyPool | None = None) -> ZillowClient:
+    """shared client used by the module-level functions, one per proxy URL or pool
+
+    Args:
+        proxy_url (str | ProxyPool | None, optional): proxy URL, or pool of proxies, for
+            masking the requests. Defaults to None.
+
+    Returns:
+        ZillowClient: client for that proxy
+    """
+    with _clients_lock:
+        client = _clients.get(proxy_url)
+        if client is None:
+            client = _clients[proxy_url] = ZillowClient(proxy_url)
+        return client
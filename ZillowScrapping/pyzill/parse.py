@@ -1,10 +1,26 @@
 from html import unescape
 from json import loads
+from re import IGNORECASE, compile
 from typing import Any
 
 from bs4 import BeautifulSoup  # type: ignore
 
-from pyzill.utils import remove_space,get_nested_value
+from pyzill.utils import remove_space,get_nested_value,iter_json_items
+
+try:
+    from orjson import JSONDecodeError as _OrjsonDecodeError, loads as _orjson_loads  # type: ignore
+except ImportError:
+    _orjson_loads = None
+
+# The attribute must be "id" itself, not e.g. data-id (whitespace before it, not a word boundary).
+regex_next_data_open = compile(rb"""<script\b[^>]*?\sid\s*=\s*["']?__NEXT_DATA__(?=["'\s>])[^>]*>""", IGNORECASE)
+regex_script_close = compile(rb"</script", IGNORECASE)
+# Bytes that unescape()/remove_space() would change: "&", whitespace other than a
+# lone ASCII space (ASCII controls and the UTF-8 forms of the Unicode spaces).
+regex_needs_cleanup = compile(
+    rb"&|[\t\n\x0b\x0c\r\x1c-\x1f]|  |\xc2[\x85\xa0]|\xe1\x9a\x80"
+    rb"|\xe2\x80[\x80-\x8a\xa8\xa9\xaf]|\xe2\x81\x9f|\xe3\x80\x80"
+)
 
 
 def parse_body_home(body: bytes) -> dict[str, Any]:
@@ -18,12 +34,37 @@ def parse_body_home(body: bytes) -> dict[str, Any]:
     """
     componentProps = parse_body(body)
     data_raw = get_nested_value(componentProps,"gdpClientCache")
-    property_json = loads(data_raw)
-    parsed_data={}
-    for data in property_json.values():
-        if "property" in str(data):
-            parsed_data = data.get("property")
-    return parsed_data
+    if data_raw is None:
+        return {}
+    return find_cache_value(data_raw, "property", {})
+
+def find_cache_value(cache_raw: str | dict, key_path: str, default=None, first_match: bool = False) -> Any:
+    """look up a key path in the entries of a gdpClientCache
+
+    The cache is a JSON object of query results keyed by query. Its entries are
+    decoded one at a time and dropped unless they contain the key path; the
+    value from the last entry that has it is returned, or from the first one
+    with first_match, which stops decoding as soon as it is found.
+
+    Args:
+        cache_raw (str | dict): gdpClientCache JSON text, or the decoded object
+        key_path (str): dot-separated key path inside an entry, e.g. "property"
+        default (Any, optional): returned if no entry has the key path. Defaults to None.
+        first_match (bool, optional): return the first value found. Defaults to False.
+
+    Returns:
+        Any: value at the key path
+    """
+    entries = cache_raw.values() if isinstance(cache_raw, dict) else (value for _, value in iter_json_items(cache_raw))
+    found = default
+    for entry in entries:
+        if isinstance(entry, dict):
+            value = get_nested_value(entry, key_path)
+            if value is not None:
+                if first_match:
+                    return value
+                found = value
+    return found
 
 def parse_body_deparments(body: bytes) -> dict[str, Any]:
     """parse HTML content to retrieve JSON data
@@ -41,6 +82,70 @@ def parse_body_deparments(body: bytes) -> dict[str, Any]:
 def parse_body(body: bytes) -> dict[str, Any]:
     """parse HTML content to retrieve JSON data
 
+    The __NEXT_DATA__ script is sliced out of the raw bytes without building a
+    DOM; pages the locator cannot handle go through parse_body_soup.
+
+    Args:
+        body (bytes): HTML content of web page
+
+    Returns:
+        dict[str, Any]: parsed property information
+    """
+    payload = find_next_data(body)
+    if payload is None:
+        return parse_body_soup(body)
+    data = loads_next_data(payload)
+    return get_nested_value(data,"props.pageProps.componentProps")
+
+def find_next_data(body: bytes) -> bytes | None:
+    """locate the raw text of the #__NEXT_DATA__ script
+
+    Args:
+        body (bytes): HTML content of web page
+
+    Returns:
+        bytes | None: script payload, or None if it was not found or the page
+            is not UTF-8 encoded
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    match = regex_next_data_open.search(body)
+    if match is None:
+        return None
+    end = regex_script_close.search(body, match.end())
+    if end is None:
+        return None
+    payload = body[match.end():end.start()]
+    try:
+        payload.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    return payload
+
+def loads_next_data(payload: bytes) -> Any:
+    """decode the __NEXT_DATA__ JSON like loads(remove_space(unescape(text)))
+
+    The text is only unescaped and respaced when it contains something those
+    would change, and it is decoded with orjson when it is installed.
+
+    Args:
+        payload (bytes): raw script payload from find_next_data
+
+    Returns:
+        Any: decoded JSON
+    """
+    if regex_needs_cleanup.search(payload):
+        return loads(remove_space(unescape(payload.decode("utf-8"))))
+    if _orjson_loads is not None:
+        try:
+            return _orjson_loads(payload)
+        except _OrjsonDecodeError:
+            pass  # e.g. NaN or integers beyond 64 bits, which json accepts
+    return loads(payload)
+
+def parse_body_soup(body: bytes) -> dict[str, Any]:
+    """parse HTML content to retrieve JSON data with a full BeautifulSoup parse
+
     Args:
         body (bytes): HTML content of web page
 
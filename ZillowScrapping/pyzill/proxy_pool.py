@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from typing import Any, Iterable
+
+# Responses that mean the proxy's IP is blocked rather than the request failing.
+BLOCK_STATUS_CODES = (403, 429)
+BLOCK_MARKERS = (b"px-captcha", b"captcha-container")
+
+
+def is_blocked(status_code: int, content: bytes) -> bool:
+    """whether a response is zillow's bot wall instead of the page
+
+    Args:
+        status_code (int): HTTP status of the response
+        content (bytes): body of the response
+
+    Returns:
+        bool: True for 403/429 responses and captcha pages
+    """
+    if status_code in BLOCK_STATUS_CODES:
+        return True
+    return any(marker in content for marker in BLOCK_MARKERS)
+
+
+class ProxyHealth:
+    """
+    running health of one proxy
+
+    Attributes:
+        url (str): proxy URL
+        latency (float | None): moving average of response time in seconds,
+            None until the first response
+        error_rate (float): moving average of failed requests, between 0 and 1
+        in_flight (int): requests currently using the proxy
+        requests (int): requests finished through the proxy
+        failures (int): requests that errored or were blocked
+        blocks (int): requests that were blocked
+        consecutive_failures (int): failures since the last success
+        strikes (int): times the proxy was quarantined since its last success
+        quarantined_until (float): monotonic time the quarantine ends
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.blocks = 0
+        self.consecutive_failures = 0
+        self.strikes = 0
+        self.quarantined_until = 0.0
+
+    def score(self) -> float:
+        """lower is better: expected latency, inflated by load and errors"""
+        latency = self.latency if self.latency is not None else 0.0
+        return (latency + 0.05) * (1 + self.in_flight) / max(0.05, 1 - self.error_rate)
+
+
+class ProxyPool:
+    """
+    set of proxies that pyzill requests are spread over by health
+
+    Each request takes the available proxy with the best score (low latency,
+    low error rate, few requests in flight), so concurrent requests spread over
+    the pool and slow or failing proxies get less traffic. A proxy that is
+    blocked, or fails failure_threshold times in a row, is quarantined for
+    quarantine_seconds, doubling on every new quarantine up to max_quarantine;
+    a success clears its record. When every proxy is quarantined, requests wait
+    for the first one to come back.
+
+    Pass a pool wherever pyzill takes a proxy_url.
+
+    Attributes:
+        failure_threshold (int): consecutive failures that quarantine a proxy
+        quarantine_seconds (float): first quarantine length
+        max_quarantine (float): longest quarantine
+        smoothing (float): weight of the newest sample in the moving averages
+    """
+
+    def __init__(
+        self,
+        proxy_urls: Iterable[str],
+        failure_threshold: int = 3,
+        quarantine_seconds: float = 60,
+        max_quarantine: float = 900,
+        smoothing: float = 0.3,
+    ):
+        self._proxies = {url: ProxyHealth(url) for url in proxy_urls}
+        if not self._proxies:
+            raise ValueError("a proxy pool needs at least one proxy")
+        self.failure_threshold = failure_threshold
+        self.quarantine_seconds = quarantine_seconds
+        self.max_quarantine = max_quarantine
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def _take(self, exclude: set[str]) -> tuple[str | None, float]:
+        with self._lock:
+            now = time.monotonic()
+            available = [proxy for proxy in self._proxies.values() if proxy.quarantined_until <= now]
+            if not available:
+                return None, min(proxy.quarantined_until for proxy in self._proxies.values()) - now
+            # A retry prefers proxies it has not tried yet, but reuses a tried one
+            # rather than waiting for a quarantine to end.
+            untried = [proxy for proxy in available if proxy.url not in exclude]
+            best = min(untried or available, key=ProxyHealth.score)
+            best.in_flight += 1
+            return best.url, 0.0
+
+    def acquire(self, exclude: set[str] = frozenset()) -> str:
+        """take the healthiest available proxy, waiting if all are quarantined
+
+        Args:
+            exclude (set[str], optional): proxies to avoid if another one is available,
+                e.g. the ones a retried request already failed on. Defaults to none.
+
+        Returns:
+            str: proxy URL; hand it back with release()
+        """
+        while True:
+            url, delay = self._take(exclude)
+            if url is not None:
+                return url
+            time.sleep(delay)
+
+    async def async_acquire(self, exclude: set[str] = frozenset()) -> str:
+        """async version of acquire"""
+        while True:
+            url, delay = self._take(exclude)
+            if url is not None:
+                return url
+            await asyncio.sleep(delay)
+
+    def release(self, url: str, latency: float | None = None, failed: bool = False, blocked: bool = False) -> None:
+        """record the outcome of a request made through a proxy from acquire()
+
+        Args:
+            url (str): proxy URL
+            latency (float | None, optional): response time in seconds, if a response came back
+            failed (bool, optional): the request errored (connection, timeout, 5xx). Defaults to False.
+            blocked (bool, optional): the response was a block page. Defaults to False.
+        """
+        with self._lock:
+            proxy = self._proxies[url]
+            proxy.in_flight -= 1
+            proxy.requests += 1
+            if latency is not None:
+                proxy.latency = latency if proxy.latency is None else (
+                    self.smoothing * latency + (1 - self.smoothing) * proxy.latency)
+            failed = failed or blocked
+            proxy.error_rate = self.smoothing * failed + (1 - self.smoothing) * proxy.error_rate
+            if not failed:
+                proxy.consecutive_failures = 0
+                proxy.strikes = 0
+                return
+            proxy.failures += 1
+            proxy.consecutive_failures += 1
+            if blocked:
+                proxy.blocks += 1
+            if blocked or proxy.consecutive_failures >= self.failure_threshold:
+                quarantine = min(self.max_quarantine, self.quarantine_seconds * 2 ** proxy.strikes)
+                proxy.quarantined_until = time.monotonic() + quarantine
+                proxy.strikes += 1
+                proxy.consecutive_failures = 0
+
+    def abandon(self, url: str) -> None:
+        """hand back a proxy from acquire() without recording an outcome (e.g. the request was cancelled)"""
+        with self._lock:
+            self._proxies[url].in_flight -= 1
+
+    def stats(self) -> list[dict[str, Any]]:
+        """health of every proxy, best score first
+
+        Returns:
+            list[dict[str, Any]]: one dict per proxy
+        """
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "url": proxy.url,
+                    "latency": proxy.latency,
+                    "error_rate": round(proxy.error_rate, 3),
+                    "requests": proxy.requests,
+                    "failures": proxy.failures,
+                    "blocks": proxy.blocks,
+                    "in_flight": proxy.in_flight,
+                    "quarantined_for": max(0.0, proxy.quarantined_until - now),
+                }
+                for proxy in sorted(self._proxies.values(), key=ProxyHealth.score)
+            ]
@@ -1,5 +1,25 @@
 from typing import Any, List
-from curl_cffi import requests
+from pyzill.client import ZillowClient, get_client
+from pyzill.proxy_pool import ProxyPool
+
+SEARCH_URL = "https://www.zillow.com/async-create-search-page-state"
+
+search_headers = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Accept-Language": "en",
+    "Content-Type": "application/json",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    "Sec-Ch-Ua-Mobile": "?0",
+    "Sec-Ch-Ua-Platform": '"Windows"',
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
 
 def for_sale(
     pagination: int,
@@ -15,13 +35,15 @@ def for_sale(
     sw_lat: float,
     sw_long: float,
     zoom_value: int,
-    proxy_url: str | None = None,
+    proxy_url: str | ProxyPool | None = None,
+    client: ZillowClient | None = None,
 ) -> dict[str, Any]:
     """get results of the listing that are for sale, you will get a dictionary with the keywords
     mapResults and listResults, use mapResults which contains all the listings from all paginations
     listResults is more for the right side bar that you see when searching on zillow. 
     Be aware the the maximum size of mapResults is 500 so if you get results with size 500, so if you want 
     to get the whole result frm a particular area, you need to play with the zoom, or the coordinates.
+    pyzill.search_area does that for you by splitting the area into tiles.
     Even if you try to paginate over all results, it won't work even if you use mapResults or listResults
     I would recomend not use pagination because you have all results(with 500 maximum) on mapResults
     Args:
@@ -31,7 +53,10 @@ def for_sale(
         sw_lat (float): sw latitude value
         sw_long (float): sw longitude value
         sw_long (float): sw longitude value
-        proxy_url (str | None, optional): proxy URL for masking the request. Defaults to None.
+        proxy_url (str | ProxyPool | None, optional): proxy URL for masking the request, or a
+            ProxyPool to spread the requests over. Defaults to None.
+        client (ZillowClient | None, optional): client to send the request with; defaults to
+            the shared client of proxy_url.
 
     Returns:
         dict[str, Any]: listing of properties in JSON format
@@ -40,7 +65,7 @@ def for_sale(
 		"sortSelection":  {"value": "globalrelevanceex"},
 		"isAllHomes":  {"value": True},
 	}
-    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url)
+    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url,client)
 
 def for_rent(
     pagination: int,
@@ -56,13 +81,15 @@ def for_rent(
     sw_lat: float,
     sw_long: float,
     zoom_value: int,
-    proxy_url: str | None = None,
+    proxy_url: str | ProxyPool | None = None,
+    client: ZillowClient | None = None,
 ) -> dict[str, Any]:
     """get results of the listing that are for rent, you will get a dictionary with the keywords
     mapResults and listResults, use mapResults which contains all the listings from all paginations
     listResults is more for the right side bar that you see when searching on zillow. 
     Be aware the the maximum size of mapResults is 500 so if you get results with size 500, so if you want 
     to get the whole result frm a particular area, you need to play with the zoom, or the coordinates.
+    pyzill.search_area does that for you by splitting the area into tiles.
     Even if you try to paginate over all results, it won't work even if you use mapResults or listResults
     I would recomend not use pagination because you have all results(with 500 maximum) on mapResults
     Args:
@@ -72,7 +99,10 @@ def for_rent(
         sw_lat (float): sw latitude value
         sw_long (float): sw longitude value
         sw_long (float): sw longitude value
-        proxy_url (str | None, optional): proxy URL for masking the request. Defaults to None.
+        proxy_url (str | ProxyPool | None, optional): proxy URL for masking the request, or a
+            ProxyPool to spread the requests over. Defaults to None.
+        client (ZillowClient | None, optional): client to send the request with; defaults to
+            the shared client of proxy_url.
 
     Returns:
         dict[str, Any]: listing of properties in JSON format
@@ -88,7 +118,7 @@ def for_rent(
 		"isAuction":  {"value": False},
 		"isAllHomes":  {"value": True},
 	}
-    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url)
+    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url,client)
 
 def sold(
     pagination: int,
@@ -104,13 +134,15 @@ def sold(
     sw_lat: float,
     sw_long: float,
     zoom_value: int,
-    proxy_url: str | None = None,
+    proxy_url: str | ProxyPool | None = None,
+    client: ZillowClient | None = None,
 ) -> dict[str, Any]:
     """get results of the listing that were sold, you will get a dictionary with the keywords
     mapResults and listResults, use mapResults which contains all the listings from all paginations
     listResults is more for the right side bar that you see when searching on zillow. 
     Be aware the the maximum size of mapResults is 500 so if you get results with size 500, so if you want 
     to get the whole result frm a particular area, you need to play with the zoom, or the coordinates.
+    pyzill.search_area does that for you by splitting the area into tiles.
     Even if you try to paginate over all results, it won't work even if you use mapResults or listResults
     I would recomend not use pagination because you have all results(with 500 maximum) on mapResults
     Args:
@@ -120,7 +152,10 @@ def sold(
         sw_lat (float): sw latitude value
         sw_long (float): sw longitude value
         sw_long (float): sw longitude value
-        proxy_url (str | None, optional): proxy URL for masking the request. Defaults to None.
+        proxy_url (str | ProxyPool | None, optional): proxy URL for masking the request, or a
+            ProxyPool to spread the requests over. Defaults to None.
+        client (ZillowClient | None, optional): client to send the request with; defaults to
+            the shared client of proxy_url.
 
     Returns:
         dict[str, Any]: listing of properties in JSON format
@@ -137,7 +172,7 @@ def sold(
 		"isAllHomes":  {"value": True},
 		"isRecentlySold":  {"value": True},
 	}
-    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url)
+    return search(pagination,search_value,min_beds,max_beds,min_bathrooms,max_bathrooms,min_price,max_price,ne_lat,ne_long,sw_lat,sw_long,zoom_value,rent,proxy_url,client)
     
 def search(
     pagination: int,
@@ -154,7 +189,8 @@ def search(
     sw_long: float,
     zoom_value: int,
     filter_state: dict[str, Any],
-    proxy_url: str | None = None,
+    proxy_url: str | ProxyPool | None = None,
+    client: ZillowClient | None = None,
 ) -> dict[str, Any]:
     """get results of the listing of the given page number
 
@@ -166,27 +202,14 @@ def search(
         sw_long (float): sw longitude value
         sw_long (float): sw longitude value
         filter_state (dict[str, Any]): input data for making the search
-        proxy_url (str | None, optional): proxy URL for masking the request. Defaults to None.
+        proxy_url (str | ProxyPool | None, optional): proxy URL for masking the request, or a
+            ProxyPool to spread the requests over. Defaults to None.
+        client (ZillowClient | None, optional): client to send the request with; defaults to
+            the shared client of proxy_url.
 
     Returns:
         dict[str, Any]: listing of properties in JSON format
     """
-    headers = {
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-        "Accept-Language": "en",
-        "Content-Type": "application/json",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-        "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-        "Sec-Ch-Ua-Mobile": "?0",
-        "Sec-Ch-Ua-Platform": '"Windows"',
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "none",
-        "Sec-Fetch-User": "?1",
-        "Upgrade-Insecure-Requests": "1",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    }
     inputData = {
         "searchQueryState": {
             "isMapVisible": True,
@@ -237,13 +260,6 @@ def search(
             price["max"] = max_price
         inputData["searchQueryState"]["filterState"]["price"] = price
 
-    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
-    response = requests.put(
-        url="https://www.zillow.com/async-create-search-page-state",
-        json=inputData,
-        headers=headers,
-        proxies=proxies,  
-        impersonate="chrome124",
-    )
+    response = (client or get_client(proxy_url)).put(SEARCH_URL, inputData, search_headers)
     data = response.json()
     return data.get("cat1", {}).get("searchResults", {})
\ No newline at end of file
@@ -1,9 +1,12 @@
+from json import JSONDecodeError, JSONDecoder
 from re import compile
-from typing import Tuple
+from typing import Any, Iterator, Tuple
 from urllib.parse import quote
 
 regex_space = compile(r"[\s ]+")
 regx_price = compile(r"\d+")
+regex_json_space = compile(r"[ \t\n\r]*")
+json_decoder = JSONDecoder()
 
 
 def remove_space(value: str) -> str:
@@ -27,6 +30,42 @@ def get_nested_value(dic, key_path, default=None):
             return default
     return current
 
+def iter_json_items(text: str) -> Iterator[Tuple[str, Any]]:
+    """lazily decode the members of a JSON object one at a time
+
+    Only the member being yielded is held in memory, so callers looking for one
+    entry of a large object can drop the others as they go.
+
+    Args:
+        text (str): JSON text of an object
+
+    Yields:
+        Tuple[str, Any]: key and decoded value of each member, in order
+    """
+    pos = regex_json_space.match(text).end()
+    if text[pos:pos + 1] != "{":
+        raise JSONDecodeError("Expecting '{'", text, pos)
+    pos = regex_json_space.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "}":
+        return
+    while True:
+        if text[pos:pos + 1] != '"':
+            raise JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+        key, pos = json_decoder.raw_decode(text, pos)
+        pos = regex_json_space.match(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise JSONDecodeError("Expecting ':' delimiter", text, pos)
+        pos = regex_json_space.match(text, pos + 1).end()
+        value, pos = json_decoder.raw_decode(text, pos)
+        yield key, value
+        pos = regex_json_space.match(text, pos).end()
+        delimiter = text[pos:pos + 1]
+        pos = regex_json_space.match(text, pos + 1).end()
+        if delimiter == "}":
+            return
+        if delimiter != ",":
+            raise JSONDecodeError("Expecting ',' delimiter", text, pos)
+
 def parse_proxy(ip_or_domain: str,port: str, username: str, password: str) -> (str):
     encoded_username = quote(username)
     encoded_password = quote(password)
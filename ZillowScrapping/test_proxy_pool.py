@@ -0,0 +1,117 @@
+"""
+Runs the ProxyPool against local stand-in proxies, no zillow or real proxies needed:
+two fast ones, a slow one, one answering 502, one serving the captcha page and a
+closed port. 8 threads make 320 requests, then 60 async requests go through the
+same client; every request must succeed and the bad proxies must end up quarantined.
+
+    cd ZillowScrapping && python -m pytest test_proxy_pool.py
+    cd ZillowScrapping && python test_proxy_pool.py   # same, with the per-proxy report
+"""
+import asyncio
+import collections
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pyzill
+from pyzill import ProxyPool, ZillowClient
+
+URL = "http://zillow.test/homedetails/x/7_zpid/"
+PROPERTY = {"zpid": 7}
+PAGE = (
+    '<html><script id="__NEXT_DATA__" type="application/json">'
+    + json.dumps({"props": {"pageProps": {"componentProps": {
+        "gdpClientCache": json.dumps({"Q": {"property": PROPERTY}})}}}})
+    + "</script></html>"
+).encode()
+
+hits = collections.Counter()
+
+
+def start_proxy(name: str, delay: float = 0.0, status: int = 200, body: bytes = PAGE) -> str:
+    """starts a local HTTP proxy that answers every request itself, returns its URL"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            hits[name] += 1
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def closed_port() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    sock.close()
+    return url
+
+
+def test_proxy_pool():
+    proxies = {
+        start_proxy("fast", 0.005): "fast",
+        start_proxy("fast2", 0.01): "fast2",
+        start_proxy("slow", 0.15): "slow",
+        start_proxy("broken", status=502, body=b"bad gateway"): "broken",
+        start_proxy("blocked", body=b'<div id="px-captcha"></div>'): "blocked",
+        closed_port(): "closed",
+    }
+    pool = ProxyPool(proxies, quarantine_seconds=30)
+    client = ZillowClient(pool, proxy_attempts=4)
+    errors = []
+
+    def worker():
+        for _ in range(40):
+            try:
+                if pyzill.get_from_home_url(URL, client=client) != PROPERTY:
+                    errors.append("wrong property")
+            except Exception as e:
+                errors.append(e)
+
+    started = time.time()
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"320 threaded requests in {time.time() - started:.2f}s, {len(errors)} failed")
+    print("requests per proxy:", dict(hits))
+    for stats in pool.stats():
+        latency = stats["latency"] and round(stats["latency"], 3)
+        print(f"  {proxies[stats['url']]:8s} latency={latency} error_rate={stats['error_rate']} "
+              f"requests={stats['requests']} failures={stats['failures']} blocks={stats['blocks']} "
+              f"quarantined_for={stats['quarantined_for']:.0f}s")
+
+    async def async_requests():
+        results = await asyncio.gather(*(pyzill.async_get_from_home_url(URL, client=client) for _ in range(60)))
+        await client.aclose()
+        return results
+
+    hits.clear()
+    results = asyncio.run(async_requests())
+    print("async requests per proxy:", dict(hits))
+    client.close()
+
+    bad = [url for url, name in proxies.items() if name in ("broken", "blocked", "closed")]
+    assert not errors, errors[:3]
+    assert all(result == PROPERTY for result in results)
+    assert all(stats["in_flight"] == 0 for stats in pool.stats())
+    assert all(stats["quarantined_for"] > 0 for stats in pool.stats() if stats["url"] in bad)
+    print("OK")
+
+
+if __name__ == "__main__":
+    test_proxy_pool()